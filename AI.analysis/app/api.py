@@ -1,9 +1,12 @@
+import json
 import logging
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import Optional, Dict, List
 import pandas as pd
 from app.model_manager import ModelManager
+from app.jobs import create_training_job_manager
+from app.schemas import TrainJobResponse, TrainJobStatus
 from darts import TimeSeries
 
 logging.basicConfig(level=logging.INFO)
@@ -11,6 +14,7 @@ logging.info("API server started.")
 
 app = FastAPI(title="TSMixer Model API")
 manager = ModelManager()
+training_jobs = create_training_job_manager(on_complete=manager.refresh_model)
 
 class PredictRequest(BaseModel):
     model_name: str
@@ -20,16 +24,45 @@ class PredictResponse(BaseModel):
     predictions: Dict[str, float]
     series_prediction: Optional[Dict[str, Dict[str, List]]] = None
 
-@app.post("/train")
-def train(model_name: str):
+@app.on_event("shutdown")
+def shutdown():
+    training_jobs.shutdown()
+
+@app.post("/train", response_model=TrainJobResponse)
+def train(
+    model_name: str,
+    model_type: str = "TSMixer",
+    multivariate: bool = False,
+    model_kwargs: Optional[str] = None
+):
+    if model_type != "TSMixer" or not model_name.startswith("TSMixer"):
+        logging.error(f"Unsupported training request: {model_name}, type: {model_type}")
+        raise HTTPException(status_code=400, detail="Only TSMixer models are supported.")
+
+    # TSMixerModel arguments as a JSON object, e.g. {"n_epochs": 30}; omitted, training runs 300 epochs.
+    kwargs = None
+    if model_kwargs:
+        try:
+            kwargs = json.loads(model_kwargs)
+        except json.JSONDecodeError:
+            logging.error("Invalid JSON format in model_kwargs.")
+            raise HTTPException(status_code=400, detail="model_kwargs must be a valid JSON string.")
+        if not isinstance(kwargs, dict):
+            raise HTTPException(status_code=400, detail="model_kwargs must be a JSON object.")
     try:
-        from app.train_model import train_model
-        train_model(model_name)
-        return {"message": f"{model_name} model successfully trained."}
+        job_id = training_jobs.submit(model_name, model_type, model_kwargs=kwargs, multivariate=multivariate)
+        return TrainJobResponse(job_id=job_id, status="queued")
     except Exception as e:
         logging.error(f"Error during model training: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/jobs/{job_id}", response_model=TrainJobStatus)
+def get_job(job_id: str):
+    job = training_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return TrainJobStatus(**job)
+
 @app.post("/predict/", response_model=PredictResponse)
 def predict(request: PredictRequest):
     logging.info(f"Prediction request: {request.model_name}")
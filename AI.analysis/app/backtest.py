@@ -0,0 +1,289 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from app.model_manager import ModelManager
+from app.scaling import SeriesScaler
+from app.utils import RESAMPLE_FREQ, preprocess_data, scaler_from_params
+
+BACKTEST_REPORT_PATH = os.getenv("BACKTEST_REPORT_PATH", "backtest_report.json")
+DEFAULT_HORIZONS = (1, 6, 12)
+
+# Set in each worker process by `_init_worker`.
+_history: Optional[pd.DataFrame] = None
+_manager: Optional[ModelManager] = None
+
+
+def _init_worker(history: pd.DataFrame, models_dir: str, torch_threads: int):
+    global _history, _manager
+    import torch
+    torch.set_num_threads(torch_threads)
+    _history = history
+    # A single cache slot: each worker keeps one deserialized model and reuses it while evaluating.
+    _manager = ModelManager(models_dir=models_dir, max_loaded_models=1)
+
+
+def forecast_errors(
+    forecasts: np.ndarray,
+    actuals: np.ndarray,
+    columns: Sequence[str],
+    horizons: Sequence[int]
+) -> Dict[str, Dict[str, dict]]:
+    # forecasts/actuals: (windows, steps, columns) in tank-percent units -> metrics per column and horizon step.
+    errors = forecasts - actuals
+    absolute = np.abs(errors)
+    # MAPE ignores readings at (or numerically near) zero, where it is undefined.
+    nonzero = np.abs(actuals) > 1e-6
+    relative = np.where(nonzero, absolute / np.where(nonzero, np.abs(actuals), 1.0), np.nan)
+
+    index = [h - 1 for h in horizons]
+    mae = absolute[:, index].mean(axis=0)
+    rmse = np.sqrt((errors[:, index] ** 2).mean(axis=0))
+    # A step with no nonzero actuals is an all-NaN slice; its MAPE is reported as None below.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        mape = np.nanmean(relative[:, index], axis=0) * 100
+
+    return {
+        column: {
+            str(h): {
+                "mae": float(mae[k, c]),
+                "rmse": float(rmse[k, c]),
+                "mape": None if np.isnan(mape[k, c]) else float(mape[k, c]),
+            }
+            for k, h in enumerate(horizons)
+        }
+        for c, column in enumerate(columns)
+    }
+
+
+def _evaluate_model(model_name: str, horizons: Sequence[int], stride: int, start: Optional[str]) -> dict:
+    started = time.perf_counter()
+    metadata = _manager.read_metadata(model_name)
+    if not metadata.get("scaler"):
+        raise ValueError(f"{model_name} 모델의 스케일러 정보가 없어 백테스트할 수 없습니다.")
+
+    multivariate = metadata.get("multivariate", False)
+    columns = metadata.get("columns") or metadata["scaler"]["columns"]
+    series_dict, _ = preprocess_data(
+        _history, multivariate=multivariate, scaler=scaler_from_params(metadata["scaler"])
+    )
+    series_list = [series_dict["multivariate"]] if multivariate else [series_dict[column] for column in columns]
+
+    model = _manager.get_model(model_name)
+    series_list = model.match_dtype(series_list)
+    horizon = max(horizons)
+    # retrain=False: the trained weights are applied at every origin; darts batches the windows.
+    historical = model.model.historical_forecasts(
+        series_list,
+        start=pd.Timestamp(start) if start else None,
+        forecast_horizon=horizon,
+        stride=stride,
+        retrain=False,
+        last_points_only=False,
+        overlap_end=False,
+        verbose=False
+    )
+
+    metrics, windows = {}, 0
+    for series, forecasts in zip(series_list, historical):
+        starts = series.time_index.get_indexer([forecast.start_time() for forecast in forecasts])
+        # A window whose start is not on the series' grid has no actuals to compare; index -1 would wrap around.
+        missing = starts < 0
+        if missing.any():
+            logging.warning(f"{model_name} 모델: 시작 시점이 시계열에 없는 예측 구간 {int(missing.sum())}개를 제외합니다.")
+            forecasts = [forecast for forecast, skip in zip(forecasts, missing) if not skip]
+            starts = starts[~missing]
+        if not forecasts:
+            continue
+        values = series.values(copy=False)
+        actual = values[starts[:, None] + np.arange(horizon)]
+        predicted = np.stack([forecast.values(copy=False) for forecast in forecasts])
+
+        # Errors are reported in tank-percent units, not in the standardized space the model sees.
+        scaler = SeriesScaler.from_params(metadata["scaler"], columns=list(series.components))
+        actual = actual * scaler.scale + scaler.mean
+        predicted = predicted * scaler.scale + scaler.mean
+        metrics.update(forecast_errors(predicted, actual, list(series.components), horizons))
+        windows += len(forecasts)
+
+    return {
+        "model_name": model_name,
+        "windows": windows,
+        "metrics": metrics,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def _out_of_sample_start(model_name: str, record: dict, start: Optional[str], in_sample: bool) -> Optional[str]:
+    # Forecasts of points the model was fitted to would flatter it, so the first forecast point is clipped to
+    # the first 10-minute step after the training window unless `in_sample` is set.
+    if in_sample:
+        return start
+    trained_until = record.get("trained_until")
+    if not trained_until:
+        logging.warning(
+            f"{model_name} 모델의 학습 종료 시점(trained_until)이 레지스트리에 없습니다. "
+            f"학습 구간이 평가에 포함될 수 있으므로 결과를 주의해서 해석하세요."
+        )
+        return start
+    first = pd.Timestamp(trained_until).floor(RESAMPLE_FREQ) + pd.Timedelta(RESAMPLE_FREQ)
+    if start is None or pd.Timestamp(start) < first:
+        return first.isoformat()
+    return start
+
+
+def _cache_key(record: dict, data_until: str, horizons: Sequence[int], stride: int, start: Optional[str]) -> dict:
+    return {
+        "version": record["version"],
+        "file_mtime_ns": record["file_mtime_ns"],
+        "data_until": data_until,
+        "horizons": list(horizons),
+        "stride": stride,
+        "start": start,
+    }
+
+
+def _read_report(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_report(path: str, report: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_backtest(
+    history: pd.DataFrame,
+    model_names: Optional[List[str]] = None,
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    stride: int = 1,
+    start: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    models_dir: str = "models",
+    report_path: str = BACKTEST_REPORT_PATH,
+    force: bool = False,
+    in_sample: bool = False
+) -> dict:
+    if not horizons or min(horizons) < 1:
+        raise ValueError("Horizons must be positive step counts.")
+    manager = ModelManager(models_dir=models_dir)
+    model_names = model_names or manager.list_models()
+    data_until = history.index.max().isoformat()
+    # Last forecast point a full-horizon window can start at.
+    last_start = history.index.max().floor(RESAMPLE_FREQ) - pd.Timedelta(RESAMPLE_FREQ) * (max(horizons) - 1)
+
+    # Models whose checkpoint, data and settings are unchanged keep their previous results.
+    report = _read_report(report_path)
+    results = report.get("results", {})
+    keys, model_starts, pending = {}, {}, []
+    for model_name in model_names:
+        record = manager.model_record(model_name)
+        if record is None:
+            raise ValueError(f"Model not found: {model_name}")
+        model_starts[model_name] = _out_of_sample_start(model_name, record, start, in_sample)
+        keys[model_name] = _cache_key(record, data_until, horizons, stride, model_starts[model_name])
+        cached = results.get(model_name)
+        if model_starts[model_name] is not None and pd.Timestamp(model_starts[model_name]) > last_start:
+            logging.warning(f"{model_name} 모델: {model_starts[model_name]} 이후 평가할 데이터가 없어 백테스트를 건너뜁니다.")
+            results[model_name] = {
+                "model_name": model_name,
+                "windows": 0,
+                "metrics": {},
+                "note": (
+                    f"No full {max(horizons)}-step forecast window from {model_starts[model_name]}. "
+                    f"Train with --holdout-days to leave data for the backtest."
+                ),
+                "key": keys[model_name],
+            }
+        elif force or cached is None or cached.get("key") != keys[model_name]:
+            pending.append(model_name)
+        else:
+            logging.info(f"{model_name} 모델: 이전 백테스트 결과를 재사용합니다.")
+
+    if pending:
+        cpu_count = os.cpu_count() or 1
+        max_workers = max_workers or min(len(pending), cpu_count)
+        torch_threads = max(1, cpu_count // max_workers)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(history, models_dir, torch_threads)
+        ) as executor:
+            futures = {
+                executor.submit(_evaluate_model, model_name, horizons, stride, model_starts[model_name]): model_name
+                for model_name in pending
+            }
+            for future in as_completed(futures):
+                model_name = futures[future]
+                try:
+                    results[model_name] = {**future.result(), "key": keys[model_name]}
+                    logging.info(f"{model_name} 모델 백테스트 완료 ({results[model_name]['seconds']}초).")
+                except Exception as e:
+                    # One broken model (e.g. an upload without a scaler) must not discard the others' results.
+                    # No "key": the entry is recomputed on the next run.
+                    logging.error(f"{model_name} 모델 백테스트 중 오류 발생: {e}")
+                    results[model_name] = {"model_name": model_name, "windows": 0, "metrics": {}, "error": str(e)}
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "data_until": data_until,
+        "results": results,
+    }
+    _write_report(report_path, report)
+    return report
+
+
+if __name__ == "__main__":
+    from app.train_model import load_training_data
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of trained TSMixer models.")
+    parser.add_argument("--models", default=None, help="Comma-separated model names (default: all registered).")
+    parser.add_argument("--horizons", default=",".join(str(h) for h in DEFAULT_HORIZONS))
+    parser.add_argument("--stride", type=int, default=1, help="Steps between forecast origins.")
+    parser.add_argument("--days", type=int, default=365, help="Evaluate forecast origins over the last N days.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", default=BACKTEST_REPORT_PATH)
+    parser.add_argument("--force", action="store_true", help="Recompute results even if cached.")
+    parser.add_argument(
+        "--in-sample", action="store_true",
+        help="Also forecast points inside each model's training window (default: only after trained_until)."
+    )
+    parser.add_argument("--server-downsample", action="store_true")
+    parser.add_argument("--feature-cache", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        filename=os.path.join(os.path.dirname(__file__), 'backtest.log'),
+        filemode='a',
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        level=logging.INFO,
+        encoding='utf-8'
+    )
+    history = load_training_data(args.server_downsample, args.feature_cache)
+    start = (history.index.max() - pd.Timedelta(days=args.days)).isoformat() if args.days else None
+    run_backtest(
+        history,
+        model_names=args.models.split(",") if args.models else None,
+        horizons=[int(h) for h in args.horizons.split(",")],
+        stride=args.stride,
+        start=start,
+        max_workers=args.workers,
+        report_path=args.report,
+        force=args.force,
+        in_sample=args.in_sample
+    )
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Sequence, Set, Tuple, Union
+from darts import TimeSeries
+from app.model_manager import ModelManager
+
+
+class PredictionBatcher:
+    """Coalesces concurrent prediction requests for the same model into one batched call."""
+
+    def __init__(self, manager: ModelManager, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.manager = manager
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[Tuple[str, int], List[Tuple[TimeSeries, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, int], asyncio.TimerHandle] = {}
+        # The event loop only keeps weak references to tasks; these are held until each batch finishes.
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.requests = 0
+        self.max_observed_batch_size = 0
+        self.last_batch_size = 0
+        self.last_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+
+    async def submit(self, model_name: str, series: TimeSeries, n: int = 1) -> TimeSeries:
+        loop = asyncio.get_running_loop()
+        key = (model_name, n)
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((series, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple[str, int]):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _predict_each(
+        self,
+        model_name: str,
+        series_list: Sequence[TimeSeries],
+        n: int
+    ) -> List[Union[TimeSeries, Exception]]:
+        # One failing series (e.g. shorter than input_chunk_length) must not fail the requests it was coalesced with.
+        predictions = []
+        for series in series_list:
+            try:
+                predictions.append(self.manager.predict(model_name, series, n))
+            except Exception as e:
+                predictions.append(e)
+        return predictions
+
+    async def _run_batch(self, key: Tuple[str, int], batch: List[Tuple[TimeSeries, asyncio.Future]]):
+        model_name, n = key
+        loop = asyncio.get_running_loop()
+        series_list = [series for series, _ in batch]
+        start = time.perf_counter()
+        try:
+            predictions = await loop.run_in_executor(None, self.manager.predict_batch, model_name, series_list, n)
+        except Exception as e:
+            if len(batch) == 1:
+                logging.error(f"Batch prediction failed: model={model_name}, size=1: {e}")
+                predictions = [e]
+            else:
+                logging.error(
+                    f"Batch prediction failed: model={model_name}, size={len(batch)}, retrying items individually: {e}"
+                )
+                predictions = await loop.run_in_executor(None, self._predict_each, model_name, series_list, n)
+        finally:
+            self._record(model_name, len(batch), (time.perf_counter() - start) * 1000)
+
+        for (_, future), prediction in zip(batch, predictions):
+            if future.done():
+                continue
+            if isinstance(prediction, Exception):
+                future.set_exception(prediction)
+            else:
+                future.set_result(prediction)
+
+    def _record(self, model_name: str, size: int, latency_ms: float):
+        self.batches += 1
+        self.requests += size
+        self.max_observed_batch_size = max(self.max_observed_batch_size, size)
+        self.last_batch_size = size
+        self.last_latency_ms = latency_ms
+        self.total_latency_ms += latency_ms
+        logging.info(f"Batch predicted: model={model_name}, size={size}, latency={latency_ms:.1f}ms")
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "max_observed_batch_size": self.max_observed_batch_size,
+            "last_batch_size": self.last_batch_size,
+            "last_latency_ms": self.last_latency_ms,
+            "avg_latency_ms": self.total_latency_ms / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,114 @@
+import copy
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Sequence
+import numpy as np
+import pandas as pd
+import torch
+from darts import TimeSeries
+
+INFERENCE_MODES = ("eager", "torchscript", "quantized")
+
+
+class TraceError(RuntimeError):
+    """The module cannot be traced (or its trace disagrees with eager); it will not trace on other inputs either."""
+
+
+class _PastTargetOnly(torch.nn.Module):
+    # darts modules take (x_past, x_future, x_static); serving models have no covariates.
+    def __init__(self, module: torch.nn.Module):
+        super().__init__()
+        self.module = module
+
+    def forward(self, x_past: torch.Tensor) -> torch.Tensor:
+        return self.module((x_past, None, None))[..., 0]
+
+
+@contextmanager
+def _tracing(wrapper: torch.nn.Module):
+    # Tracing probes every attribute of every submodule, and LightningModule.trainer raises outside a Trainer
+    # unless the module is marked as being scripted (as LightningModule.to_torchscript does).
+    lightning = [module for module in wrapper.modules() if hasattr(type(module), "_jit_is_scripting")]
+    for module in lightning:
+        module._jit_is_scripting = True
+    try:
+        yield
+    finally:
+        for module in lightning:
+            del module._jit_is_scripting
+
+
+class CompiledPredictor:
+    """TorchScript-traced (optionally int8 dynamic-quantized) forward pass of a fitted TSMixer for CPU serving."""
+
+    def __init__(self, module: torch.nn.Module, input_chunk_length: int, output_chunk_length: int, quantize: bool = False):
+        self.input_chunk_length = input_chunk_length
+        self.output_chunk_length = output_chunk_length
+        self.quantize = quantize
+        if next(module.parameters()).dtype != torch.float32:
+            # A private float32 copy, so the eager float64 model is left untouched.
+            module = copy.deepcopy(module).float()
+        # float32 modules are traced in place and keep sharing (possibly memory-mapped) weights.
+        wrapper = _PastTargetOnly(module).eval()
+        if quantize:
+            # Weights of the mixing MLPs become int8; activations are quantized on the fly per batch.
+            wrapper = torch.ao.quantization.quantize_dynamic(wrapper, {torch.nn.Linear}, dtype=torch.qint8)
+        self._wrapper = wrapper
+        self._traced: Dict[int, torch.jit.ScriptModule] = {}
+        self._lock = threading.Lock()
+
+    def _trace(self, n_features: int) -> torch.jit.ScriptModule:
+        # Traced lazily per input width; the batch dimension stays dynamic and is checked against eager once.
+        with self._lock:
+            traced = self._traced.get(n_features)
+            if traced is not None:
+                return traced
+            example = torch.randn(2, self.input_chunk_length, n_features)
+            check = torch.randn(3, self.input_chunk_length, n_features)
+            try:
+                with torch.no_grad(), _tracing(self._wrapper):
+                    traced = torch.jit.freeze(torch.jit.trace(self._wrapper, example, check_trace=False))
+                    matches = torch.allclose(traced(check), self._wrapper(check), atol=1e-4)
+            except Exception as e:
+                raise TraceError(f"Tracing failed: {e}") from e
+            if not matches:
+                raise TraceError("Traced module does not generalize across batch sizes.")
+            self._traced[n_features] = traced
+            logging.info(
+                f"TSMixer module traced (features={n_features}, quantized={self.quantize})."
+            )
+            return traced
+
+    def forecast(self, windows: np.ndarray, n: int) -> np.ndarray:
+        # windows: (batch, input_chunk_length, features) -> (batch, n, features), autoregressive beyond one chunk.
+        traced = self._trace(windows.shape[2])
+        x = torch.from_numpy(np.ascontiguousarray(windows, dtype=np.float32))
+        with torch.no_grad():
+            outputs = [traced(x)]
+            produced = self.output_chunk_length
+            while produced < n:
+                # As in darts, the last chunk ends exactly at step n: when n is not a multiple of
+                # output_chunk_length, the previous chunk is cut short and the input rolls by less.
+                keep = min(self.output_chunk_length, n - produced)
+                outputs[-1] = outputs[-1][:, :keep]
+                x = torch.cat([x, outputs[-1]], dim=1)[:, -self.input_chunk_length:]
+                outputs.append(traced(x))
+                produced += keep
+        return torch.cat(outputs, dim=1)[:, :n].numpy()
+
+    def predict_batch(self, series_list: Sequence[TimeSeries], n: int) -> List[TimeSeries]:
+        windows = []
+        for series in series_list:
+            if len(series) < self.input_chunk_length:
+                raise ValueError(
+                    f"Series has {len(series)} points; at least {self.input_chunk_length} are required."
+                )
+            windows.append(series.values(copy=False)[-self.input_chunk_length:])
+        values = self.forecast(np.stack(windows), n)
+
+        predictions = []
+        for series, forecast in zip(series_list, values):
+            times = pd.date_range(start=series.end_time() + series.freq, periods=n, freq=series.freq)
+            predictions.append(TimeSeries.from_times_and_values(times, forecast, columns=series.components))
+        return predictions
@@ -0,0 +1,90 @@
+from typing import TYPE_CHECKING, Iterable, List, Optional
+import msgpack
+import numpy as np
+import orjson
+from darts import TimeSeries
+from fastapi import Response
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+def negotiate(accept: Optional[str], supported: Iterable[str]) -> str:
+    # First supported media type in the Accept header wins; anything else falls back to JSON.
+    supported = tuple(supported)
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in supported:
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def json_payload(prediction: TimeSeries) -> dict:
+    # Same shape as prediction_to_payload, left as NumPy arrays for orjson to serialize natively.
+    return {
+        "time_index": prediction.time_index.values,
+        "values": np.ascontiguousarray(prediction.values(copy=False)),
+        "columns": prediction.components.tolist()
+    }
+
+
+def compact_payload(prediction: TimeSeries) -> dict:
+    # Regular forecasts are fully described by start + freq; values are flat little-endian float32, time-major.
+    values = np.ascontiguousarray(prediction.values(copy=False), dtype="<f4")
+    return {
+        "start": prediction.start_time().isoformat(),
+        "freq": prediction.freq_str,
+        "columns": prediction.components.tolist(),
+        "shape": list(values.shape),
+        "values": values.tobytes()
+    }
+
+
+def arrow_table(prediction: TimeSeries) -> "pa.Table":
+    # Imported here so the JSON and MessagePack responses do not depend on pyarrow.
+    import pyarrow as pa
+    values = prediction.values(copy=False)
+    return pa.table(
+        {column: pa.array(values[:, j].astype(np.float32)) for j, column in enumerate(prediction.components)},
+        metadata={"start": prediction.start_time().isoformat(), "freq": prediction.freq_str}
+    )
+
+
+def _arrow_bytes(table: "pa.Table") -> bytes:
+    import pyarrow as pa
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def prediction_response(prediction: TimeSeries, accept: Optional[str]) -> Response:
+    media_type = negotiate(accept, (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE))
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return Response(msgpack.packb(compact_payload(prediction)), media_type=MSGPACK_MEDIA_TYPE)
+    if media_type == ARROW_MEDIA_TYPE:
+        return Response(_arrow_bytes(arrow_table(prediction)), media_type=ARROW_MEDIA_TYPE)
+    content = orjson.dumps({"series_prediction": {"series_prediction": json_payload(prediction)}}, option=ORJSON_OPTIONS)
+    return Response(content, media_type=JSON_MEDIA_TYPE)
+
+
+def batch_response(results: List[dict], accept: Optional[str]) -> Response:
+    # results: {"model_name", "prediction" (TimeSeries or None), "error"} per item, in request order.
+    media_type = negotiate(accept, (MSGPACK_MEDIA_TYPE,))
+    encode = compact_payload if media_type == MSGPACK_MEDIA_TYPE else json_payload
+    payload = {"results": [
+        {
+            "model_name": result["model_name"],
+            "series_prediction": encode(result["prediction"]) if result.get("prediction") is not None else None,
+            "error": result.get("error")
+        }
+        for result in results
+    ]}
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return Response(msgpack.packb(payload), media_type=MSGPACK_MEDIA_TYPE)
+    return Response(orjson.dumps(payload, option=ORJSON_OPTIONS), media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,86 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+from darts import TimeSeries
+
+ForecastKey = Tuple[str, int, str, int]
+
+
+def series_fingerprint(series: TimeSeries) -> str:
+    # Component names pick the scaler parameters, so identical values from two tanks must not share a key.
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\x1f".join(series.components).encode())
+    digest.update(str(series.dtype).encode())
+    digest.update(series.values(copy=False).tobytes())
+    digest.update(series.time_index.asi8.tobytes())
+    digest.update(str(series.freq).encode())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """TTL + LRU cache of forecast results keyed on model version, input window and horizon."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[ForecastKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(model_name: str, version: int, series: TimeSeries, n: int) -> ForecastKey:
+        return (model_name, version, series_fingerprint(series), n)
+
+    def get(self, key: ForecastKey) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: ForecastKey, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_model(self, model_name: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_name]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
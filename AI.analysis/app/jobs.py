@@ -0,0 +1,175 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Optional
+from pytorch_lightning.callbacks import Callback
+
+# Set in each worker process by `_init_worker`.
+_progress_queue = None
+
+
+def _init_worker(progress_queue, torch_threads: Optional[int]):
+    global _progress_queue
+    _progress_queue = progress_queue
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+
+
+class TrainingProgressCallback(Callback):
+    def __init__(self, job_id: str, progress_queue):
+        self.job_id = job_id
+        self.progress_queue = progress_queue
+
+    def on_train_epoch_end(self, trainer, pl_module):
+        loss = trainer.callback_metrics.get("train_loss")
+        self.progress_queue.put((self.job_id, "progress", {
+            "epoch": trainer.current_epoch + 1,
+            "n_epochs": trainer.max_epochs,
+            "loss": float(loss) if loss is not None else None,
+        }))
+
+
+def run_training_job(
+    job_id: str,
+    model_name: str,
+    model_type: str,
+    model_kwargs: Optional[dict] = None,
+    multivariate: bool = False
+):
+    from app.train_model import train_model
+
+    _progress_queue.put((job_id, "started", {"started_at": time.time()}))
+    train_model(
+        model_name,
+        model_type,
+        model_kwargs,
+        callbacks=[TrainingProgressCallback(job_id, _progress_queue)],
+        multivariate=multivariate
+    )
+
+
+class TrainingJobManager:
+    """Runs training jobs in a process pool and tracks their status for polling."""
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        torch_threads: Optional[int] = None,
+        on_complete: Optional[Callable[[str], None]] = None
+    ):
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue = context.Queue()
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, torch_threads)
+        )
+        self.max_workers = max_workers
+        self.on_complete = on_complete
+        self.jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def submit(
+        self,
+        model_name: str,
+        model_type: str = "TSMixer",
+        model_kwargs: Optional[dict] = None,
+        multivariate: bool = False
+    ) -> str:
+        job_id = uuid.uuid4().hex
+        n_epochs = (model_kwargs or {}).get("n_epochs")
+        with self._lock:
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "model_name": model_name,
+                "status": "queued",
+                "epoch": 0,
+                "n_epochs": n_epochs,
+                "loss": None,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "duration": None,
+                "error": None,
+            }
+        future = self._executor.submit(
+            run_training_job, job_id, model_name, model_type, model_kwargs, multivariate
+        )
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+        logging.info(f"Training job queued: {job_id} ({model_name})")
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _listen(self):
+        while True:
+            message = self._progress_queue.get()
+            if message is None:
+                return
+            job_id, event, payload = message
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if not job:
+                    continue
+                if event == "started" and job["status"] == "queued":
+                    job["status"] = "running"
+                job.update(payload)
+                if job["finished_at"] and job["started_at"]:
+                    job["duration"] = job["finished_at"] - job["started_at"]
+
+    def _on_done(self, job_id: str, future: Future):
+        # Queued jobs are cancelled on shutdown; exception() would raise CancelledError for them.
+        cancelled = future.cancelled()
+        error = None if cancelled else future.exception()
+        with self._lock:
+            job = self.jobs[job_id]
+            job["finished_at"] = time.time()
+            if job["started_at"]:
+                job["duration"] = job["finished_at"] - job["started_at"]
+            if cancelled:
+                job["status"] = "cancelled"
+            elif error:
+                job["status"] = "failed"
+                job["error"] = str(error)
+            else:
+                job["status"] = "succeeded"
+            model_name = job["model_name"]
+
+        if cancelled:
+            logging.warning(f"Training job cancelled: {job_id} ({model_name})")
+            return
+        if error:
+            logging.error(f"Training job failed: {job_id} ({model_name}): {error}")
+            return
+        logging.info(f"Training job succeeded: {job_id} ({model_name})")
+        if self.on_complete:
+            try:
+                self.on_complete(model_name)
+            except Exception as e:
+                logging.error(f"Failed to refresh '{model_name}' after training: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+
+
+def create_training_job_manager(on_complete: Optional[Callable[[str], None]] = None) -> TrainingJobManager:
+    max_workers = int(os.getenv("TRAIN_MAX_WORKERS", "1"))
+    torch_threads = os.getenv("TRAIN_TORCH_THREADS")
+    return TrainingJobManager(
+        max_workers=max_workers,
+        # By default all training processes together use half the cores; the rest stay with prediction.
+        torch_threads=int(torch_threads) if torch_threads else max(1, (os.cpu_count() or 1) // (2 * max_workers)),
+        on_complete=on_complete
+    )
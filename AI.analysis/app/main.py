@@ -1,12 +1,34 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 import os
 import json
+import uuid
+import numpy as np
 from app.model_manager import ModelManager
-from app.schemas import ModelUploadResponse, PredictRequest, PredictResponse
-from darts import TimeSeries
-import pandas as pd
+from app.batcher import PredictionBatcher
+from app.encoding import batch_response, prediction_response
+from app.schemas import (
+    BatchPredictRequest,
+    BatchPredictResponse,
+    ModelRecord,
+    ModelUploadResponse,
+    PredictRequest,
+    PredictResponse,
+    ThresholdEstimate,
+    ThresholdRequest,
+    ThresholdResponse,
+    ThresholdResult,
+)
+from app.utils import (
+    prediction_to_payload,
+    series_from_arrow,
+    series_from_npy,
+    series_from_payload,
+    stack_forecasts,
+    threshold_crossings,
+)
 import logging
 from app.config import CORS_ORIGINS
 
@@ -31,13 +53,33 @@ logging.basicConfig(
     encoding='utf-8'
 )
 
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "32"))
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "5"))
+
 model_manager = ModelManager(models_dir=MODEL_DIR)
+prediction_batcher = PredictionBatcher(
+    model_manager,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_MAX_WAIT_MS
+)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def _stream_to_file(upload: UploadFile, path: str):
+    # Copied in fixed-size chunks so large checkpoints are never held in memory at once.
+    with open(path, "wb") as f:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await run_in_threadpool(f.write, chunk)
 
 @app.post("/upload-model/", response_model=ModelUploadResponse)
 async def upload_model(
     file: UploadFile = File(...),
     model_type: str = Form(...),
-    model_kwargs: Optional[str] = Form(None)
+    model_kwargs: Optional[str] = Form(None),
+    checkpoint: Optional[UploadFile] = File(None)
 ):
     logging.info(f"Received upload request: {file.filename}, type: {model_type}")
 
@@ -45,23 +87,12 @@ async def upload_model(
         logging.error(f"Invalid file extension: {file.filename}")
         raise HTTPException(status_code=400, detail="Only .pt files are allowed for TSMixer.")
 
-    model_name, ext = os.path.splitext(file.filename)
+    model_name, ext = os.path.splitext(os.path.basename(file.filename))
 
     if model_type != "TSMixer" or ext != ".pt":
         logging.error(f"Model type and file extension mismatch: {model_type}, {ext}")
         raise HTTPException(status_code=400, detail="Model type and file extension do not match. Only TSMixer with .pt files are allowed.")
 
-    file_path = os.path.join(MODEL_DIR, file.filename)
-
-    try:
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        logging.info(f"File saved: {file_path}")
-    except Exception as e:
-        logging.error(f"File save failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
-
     kwargs = None
     if model_kwargs:
         try:
@@ -71,17 +102,40 @@ async def upload_model(
             logging.error("Invalid JSON format in model_kwargs.")
             raise HTTPException(status_code=400, detail="model_kwargs must be a valid JSON string.")
 
+    # Staged under a unique name that model discovery ignores; models/<name>.pt is only replaced once
+    # the staged checkpoint has loaded successfully.
+    staged_path = os.path.join(MODEL_DIR, f".{model_name}.{uuid.uuid4().hex}.upload")
     try:
-        model_manager.load_model(model_name, file_path, model_type, model_kwargs=kwargs)
-        logging.info(f"Model loaded: {model_name}")
-    except ValueError as ve:
-        logging.error(f"Model load error: {ve}")
-        raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        logging.error(f"Model load failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Error loading model: {e}")
+        try:
+            await _stream_to_file(file, staged_path)
+            if checkpoint is not None:
+                await _stream_to_file(checkpoint, f"{staged_path}.ckpt")
+            logging.info(f"File staged: {staged_path}")
+        except Exception as e:
+            logging.error(f"File save failed: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
+
+        try:
+            version = await run_in_threadpool(
+                model_manager.install_model, model_name, staged_path, model_type, kwargs
+            )
+            logging.info(f"Model loaded: {model_name} (version {version})")
+        except ValueError as ve:
+            logging.error(f"Model load error: {ve}")
+            raise HTTPException(status_code=400, detail=str(ve))
+        except Exception as e:
+            logging.error(f"Model load failed: {e}")
+            raise HTTPException(status_code=500, detail=f"Error loading model: {e}")
+    finally:
+        for path in (staged_path, f"{staged_path}.ckpt"):
+            if os.path.exists(path):
+                os.remove(path)
 
-    return ModelUploadResponse(model_name=model_name, message="Model uploaded and loaded successfully.")
+    return ModelUploadResponse(
+        model_name=model_name,
+        message="Model uploaded and loaded successfully.",
+        version=version
+    )
 
 @app.get("/models/", response_model=List[str])
 def list_models():
@@ -89,33 +143,29 @@ def list_models():
     logging.info(f"Loaded models list: {models}")
     return models
 
+@app.get("/models/{model_name}", response_model=ModelRecord)
+def model_record(model_name: str):
+    record = model_manager.model_record(model_name)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Model not found: {model_name}")
+    return record
+
+@app.get("/stats/")
+def stats():
+    return {
+        "model_cache": model_manager.cache_stats(),
+        "forecast_cache": model_manager.forecast_cache_stats(),
+        "prediction_batcher": prediction_batcher.stats(),
+    }
+
 @app.post("/predict/", response_model=PredictResponse)
-def predict(request: PredictRequest):
+async def predict(request: PredictRequest, http_request: Request):
     logging.info(f"Prediction request: {request.model_name}")
 
     try:
-        series_predictions = {}
-
         if request.series:
-            time_index = request.series.get("time_index")
-            values = request.series.get("values")
-
-            if not time_index or not values:
-                logging.error("Missing 'time_index' or 'values' in series data.")
-                raise ValueError("`time_index` and `values` are required in series data.")
-
             try:
-                if len(time_index) == 1:
-                    series = TimeSeries.from_times_and_values(pd.to_datetime(time_index), values, freq='H')
-                    logging.info("Single data point, frequency set to 'H'.")
-                else:
-                    inferred_freq = pd.infer_freq(pd.to_datetime(time_index))
-                    if inferred_freq:
-                        series = TimeSeries.from_times_and_values(pd.to_datetime(time_index), values, freq=inferred_freq)
-                        logging.info(f"Inferred frequency: {inferred_freq}")
-                    else:
-                        logging.error("Cannot infer frequency.")
-                        raise ValueError("Cannot infer frequency. Please ensure consistent time intervals or provide multiple data points.")
+                series = series_from_payload(request.series, freq=request.freq)
             except Exception as e:
                 logging.error(f"Time series conversion error: {e}")
                 raise HTTPException(status_code=400, detail=f"Invalid `series` format: {e}")
@@ -124,26 +174,167 @@ def predict(request: PredictRequest):
                 logging.error("Only TSMixer models are supported.")
                 raise ValueError("Only TSMixer models are supported.")
 
-            prediction_series = model_manager.predict(request.model_name, series, n=1)
+            prediction_series = await prediction_batcher.submit(request.model_name, series, n=1)
             logging.info(f"TSMixer prediction result: {prediction_series}")
 
-            prediction = {
-                "time_index": prediction_series.time_index.tolist(),
-                "values": prediction_series.values().tolist()
-            }
-            series_predictions["series_prediction"] = prediction
+            # Encoded directly (JSON via orjson, MessagePack or Arrow) without response-model validation.
+            return prediction_response(prediction_series, http_request.headers.get("accept"))
+
+        logging.error("No series data provided for TSMixer model prediction.")
+        raise ValueError("Series data is required for TSMixer model prediction.")
+
+    except HTTPException:
+        raise
+    except ValueError as ve:
+        logging.error(f"Prediction error: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logging.error(f"Error during prediction: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {e}")
+
+NPY_CONTENT_TYPES = ("application/x-npy", "application/octet-stream")
+ARROW_CONTENT_TYPES = ("application/vnd.apache.arrow.stream",)
 
-        if not series_predictions:
-            logging.error("No series data provided for TSMixer model prediction.")
-            raise ValueError("Series data is required for TSMixer model prediction.")
+@app.post("/predict/binary", response_model=PredictResponse)
+async def predict_binary(
+    request: Request,
+    model_name: str,
+    start: Optional[str] = None,
+    freq: Optional[str] = None,
+    columns: Optional[str] = None,
+    horizon: int = 1
+):
+    # Large windows as a raw .npy array (with `start`/`freq` query parameters) or an Arrow IPC stream.
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    logging.info(f"Binary prediction request: {model_name}, {content_type}")
 
-        return PredictResponse(
-            series_prediction=series_predictions if series_predictions else None
-        )
+    if not model_name.startswith("TSMixer"):
+        raise HTTPException(status_code=400, detail="Only TSMixer models are supported.")
+    if horizon < 1:
+        raise HTTPException(status_code=400, detail="`horizon` must be at least 1.")
 
+    body = await request.body()
+    try:
+        if content_type in ARROW_CONTENT_TYPES:
+            series = series_from_arrow(body, freq=freq)
+        elif content_type in NPY_CONTENT_TYPES:
+            if not start:
+                raise ValueError("`start` and `freq` query parameters are required for .npy bodies.")
+            series = series_from_npy(body, start, freq, columns=columns.split(",") if columns else None)
+        else:
+            raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Time series conversion error: {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid series body: {e}")
+
+    try:
+        prediction_series = await prediction_batcher.submit(model_name, series, n=horizon)
     except ValueError as ve:
         logging.error(f"Prediction error: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logging.error(f"Error during prediction: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction error: {e}")
+
+    return prediction_response(prediction_series, request.headers.get("accept"))
+
+def _forecast_items(items: list) -> list:
+    # Returns (input series, forecast) per item in request order; failures are returned as exceptions.
+    outcomes: list = [None] * len(items)
+    groups = {}
+    index_cache = {}
+
+    for i, item in enumerate(items):
+        try:
+            if not item.model_name.startswith("TSMixer"):
+                raise ValueError("Only TSMixer models are supported.")
+            if item.horizon < 1:
+                raise ValueError("`horizon` must be at least 1.")
+            series = series_from_payload(item.series, freq=item.freq, index_cache=index_cache)
+        except Exception as e:
+            logging.error(f"Batch item {i} rejected: {e}")
+            outcomes[i] = (None, e)
+            continue
+        groups.setdefault(item.model_name, []).append((i, series))
+
+    for model_name, members in groups.items():
+        # One forward pass per model at the longest requested horizon; shorter ones are sliced.
+        n = max(items[i].horizon for i, _ in members)
+        try:
+            predictions = model_manager.predict_batch(model_name, [series for _, series in members], n=n)
+        except Exception as e:
+            logging.error(f"Batch prediction failed for '{model_name}', retrying items individually: {e}")
+            predictions = []
+            for _, series in members:
+                try:
+                    predictions.append(model_manager.predict(model_name, series, n=n))
+                except Exception as item_error:
+                    predictions.append(item_error)
+
+        for (i, series), prediction in zip(members, predictions):
+            if not isinstance(prediction, Exception):
+                prediction = prediction[:items[i].horizon]
+            outcomes[i] = (series, prediction)
+
+    return outcomes
+
+@app.post("/predict/batch", response_model=BatchPredictResponse)
+def predict_batch(request: BatchPredictRequest, http_request: Request):
+    logging.info(f"Batch prediction request: {len(request.items)} items")
+
+    results = []
+    for item, (_, prediction) in zip(request.items, _forecast_items(request.items)):
+        if isinstance(prediction, Exception):
+            results.append({"model_name": item.model_name, "error": str(prediction)})
+        else:
+            results.append({"model_name": item.model_name, "prediction": prediction})
+
+    return batch_response(results, http_request.headers.get("accept"))
+
+@app.post("/predict/thresholds", response_model=ThresholdResponse)
+def predict_thresholds(request: ThresholdRequest):
+    logging.info(f"Threshold estimate request: {len(request.items)} items")
+
+    results: List[Optional[ThresholdResult]] = [None] * len(request.items)
+    forecasted = []
+    for i, (item, (series, prediction)) in enumerate(zip(request.items, _forecast_items(request.items))):
+        if isinstance(prediction, Exception):
+            results[i] = ThresholdResult(model_name=item.model_name, label=item.label, error=str(prediction))
+        else:
+            forecasted.append((i, series, prediction))
+
+    if forecasted:
+        # Every tank of every item against every threshold in one vectorized comparison.
+        n_thresholds = max(len(request.items[i].thresholds) for i, _, _ in forecasted)
+        thresholds = np.full((len(forecasted), n_thresholds), np.nan)
+        for k, (i, _, _) in enumerate(forecasted):
+            thresholds[k, :len(request.items[i].thresholds)] = request.items[i].thresholds
+        crossings = threshold_crossings(stack_forecasts([prediction for _, _, prediction in forecasted]), thresholds)
+
+        for k, (i, series, prediction) in enumerate(forecasted):
+            item = request.items[i]
+            last_observed = series.end_time()
+            estimates = []
+            for c, column in enumerate(prediction.components):
+                for t, threshold in enumerate(item.thresholds):
+                    index = crossings[k, c, t]
+                    if index < 0:
+                        estimates.append(ThresholdEstimate(column=column, threshold=threshold))
+                        continue
+                    crossing_time = prediction.time_index[index]
+                    estimates.append(ThresholdEstimate(
+                        column=column,
+                        threshold=threshold,
+                        minutes_until=(crossing_time - last_observed).total_seconds() / 60,
+                        crossing_time=crossing_time
+                    ))
+            results[i] = ThresholdResult(
+                model_name=item.model_name,
+                label=item.label,
+                series_prediction=prediction_to_payload(prediction),
+                estimates=estimates
+            )
+
+    return ThresholdResponse(results=results)
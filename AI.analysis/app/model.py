@@ -1,5 +1,11 @@
+import logging
+from typing import List, Optional, Sequence, Union
+import numpy as np
+import torch
 from darts.models import TSMixerModel as TSMixer
 from darts import TimeSeries
+from app.compiled import CompiledPredictor, TraceError
+from app.scaling import SeriesScaler
 
 class BaseModel:
     def train(self, X, y):
@@ -8,6 +14,9 @@ class BaseModel:
     def predict(self, X):
         raise NotImplementedError
 
+    def predict_batch(self, X_list):
+        raise NotImplementedError
+
     def save(self, filepath):
         raise NotImplementedError
 
@@ -24,12 +33,110 @@ class TSMixerModel(BaseModel):
             n_epochs=n_epochs,
             **model_kwargs
         )
+        # Set from the checkpoint metadata; inputs and forecasts are then in tank-percent units.
+        self.scaler: Optional[SeriesScaler] = None
+        # Set by compile(); predictions then bypass the darts/Lightning predict loop.
+        self.compiled: Optional[CompiledPredictor] = None
+
+    @property
+    def input_chunk_length(self) -> int:
+        return self.model.input_chunk_length
+
+    @property
+    def output_chunk_length(self) -> int:
+        return self.model.output_chunk_length
+
+    @property
+    def n_components(self) -> Optional[int]:
+        # Width of the target the network was trained on; None before training or loading.
+        train_sample = getattr(self.model, "train_sample", None)
+        return train_sample[0].shape[1] if train_sample else None
+
+    def match_dtype(self, series):
+        # Inputs are cast to the precision the network was trained in (float32 or float64).
+        module = getattr(self.model, "model", None)
+        if module is None:
+            return series
+        dtype = np.float64 if next(module.parameters()).dtype == torch.float64 else np.float32
+        if isinstance(series, TimeSeries):
+            return series if series.dtype == dtype else series.astype(dtype)
+        return [self.match_dtype(s) for s in series]
+
+    def _fit(self, series, callbacks: Optional[list] = None, **fit_kwargs):
+        # Callbacks are attached for this fit only so they are never pickled into the checkpoint.
+        trainer_callbacks = self.model.trainer_params.setdefault("callbacks", [])
+        extra_callbacks = list(callbacks or [])
+        trainer_callbacks.extend(extra_callbacks)
+        try:
+            self.model.fit(series, **fit_kwargs)
+        finally:
+            for callback in extra_callbacks:
+                trainer_callbacks.remove(callback)
+
+    def train(self, series: Union[TimeSeries, Sequence[TimeSeries]], callbacks: Optional[list] = None):
+        self._fit(series, callbacks)
+
+    def fine_tune(
+        self,
+        series: Union[TimeSeries, Sequence[TimeSeries]],
+        epochs: int,
+        callbacks: Optional[list] = None
+    ):
+        # Continues from the loaded weights for `epochs` additional epochs.
+        self._fit(self.match_dtype(series), callbacks, epochs=epochs)
+
+    def compile(self, quantize: bool = False):
+        module = getattr(self.model, "model", None)
+        if module is None:
+            raise ValueError("Model must be trained or loaded before compiling.")
+        if getattr(self.model, "likelihood", None) is not None:
+            raise ValueError("Probabilistic models are served in eager mode.")
+        for uses in ("uses_past_covariates", "uses_future_covariates", "uses_static_covariates"):
+            if getattr(self.model, uses, False):
+                raise ValueError("Models with covariates are served in eager mode.")
+        self.compiled = CompiledPredictor(
+            module, self.input_chunk_length, self.output_chunk_length, quantize=quantize
+        )
 
-    def train(self, series: TimeSeries):
-        self.model.fit(series)
+    def _forecast(self, series_list: List[TimeSeries], n: int, batch_size: Optional[int] = None) -> List[TimeSeries]:
+        if self.compiled is not None:
+            try:
+                return self.compiled.predict_batch(series_list, n)
+            except TraceError as e:
+                # Inputs were validated in predict_batch, so the module itself cannot be compiled.
+                logging.warning(f"TSMixer module cannot be compiled, serving it in eager mode from now on: {e}")
+                self.compiled = None
+            except RuntimeError as e:
+                logging.warning(f"Compiled inference failed, falling back to eager mode for this batch: {e}")
+        return self.model.predict(n=n, series=self.match_dtype(series_list), batch_size=batch_size)
 
     def predict(self, series: TimeSeries, n: int) -> TimeSeries:
-        return self.model.predict(n)
+        return self.predict_batch([series], n)[0]
+
+    def predict_batch(
+        self,
+        series_list: Sequence[TimeSeries],
+        n: int,
+        batch_size: Optional[int] = None
+    ) -> List[TimeSeries]:
+        # darts stacks the input windows of all series into shared forward passes.
+        series_list = list(series_list)
+        if not series_list:
+            return []
+        # Checked up front so a malformed request is rejected (400) instead of reaching the compiled module.
+        n_components = self.n_components
+        for series in series_list:
+            if n_components is not None and series.n_components != n_components:
+                raise ValueError(
+                    f"Series has {series.n_components} column(s); the model was trained on {n_components}."
+                )
+        batch_size = batch_size or len(series_list)
+        if self.scaler is not None:
+            series_list = [self.scaler.transform(series) for series in series_list]
+        predictions = self._forecast(series_list, n, batch_size)
+        if self.scaler is not None:
+            predictions = [self.scaler.inverse_transform(prediction) for prediction in predictions]
+        return predictions
 
     def save(self, filepath):
         self.model.save(filepath)
@@ -0,0 +1,127 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+LOAD_LOCK_STRIPES = 64
+
+
+class ModelCache:
+    """LRU cache of loaded models bounded by a model count and/or byte budget."""
+
+    def __init__(self, max_models: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        # A fixed pool of striped locks: bounded however many model names are ever requested.
+        self._load_locks: List[threading.Lock] = [threading.Lock() for _ in range(LOAD_LOCK_STRIPES)]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Tuple[Any, int]],
+        expected_size: Optional[Callable[[], Optional[int]]] = None
+    ) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        # Only one thread deserializes a given model; the others wait and reuse it.
+        with self.load_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+            if expected_size is not None:
+                size = expected_size()
+                if size:
+                    self.reserve(size)
+            value, size = loader()
+            self.put(key, value, size)
+            return value
+
+    def load_lock(self, key: str) -> threading.Lock:
+        # Held while a model is deserialized; swapping in a new version takes it too, so a slow load of
+        # the previous checkpoint cannot overwrite the new entry. Names sharing a stripe only serialize their loads;
+        # the lock is never taken twice on one call path, so that cannot deadlock.
+        return self._load_locks[hash(key) % len(self._load_locks)]
+
+    def put(self, key: str, value: Any, size: int = 0):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            self._evict()
+
+    def reserve(self, size: int):
+        # Evicts ahead of a load using the checkpoint's recorded size, so the new model is
+        # deserialized within the budget instead of overshooting it until the next put.
+        with self._lock:
+            while self._entries and self._over_budget(extra_models=1, extra_bytes=size):
+                self._evict_oldest()
+
+    def invalidate(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry[1]
+
+    def _evict(self):
+        # The most recently inserted entry is always kept, even if it alone exceeds the budget.
+        while len(self._entries) > 1 and self._over_budget():
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        key, (_, size) = self._entries.popitem(last=False)
+        self._total_bytes -= size
+        self.evictions += 1
+        logging.info(f"'{key}' model evicted from cache.")
+
+    def _over_budget(self, extra_models: int = 0, extra_bytes: int = 0) -> bool:
+        if self.max_models is not None and len(self._entries) + extra_models > self.max_models:
+            return True
+        if self.max_bytes is not None and self._total_bytes + extra_bytes > self.max_bytes:
+            return True
+        return False
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "loaded_models": len(self._entries),
+                "loaded_bytes": self._total_bytes,
+                "max_models": self.max_models,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
@@ -1,52 +1,331 @@
 import os
+import json
 import logging
-from typing import Dict, Optional
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 from darts import TimeSeries
+from app.compiled import INFERENCE_MODES
 from app.model import TSMixerModel
+from app.model_cache import ModelCache
+from app.scaling import SeriesScaler
+from app.registry import ModelRegistry
+from app.shared_weights import checkpoint_mtime, map_weights
+from app.forecast_cache import ForecastCache
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
 
 class ModelManager:
-    def __init__(self, models_dir: str = "models"):
+    def __init__(
+        self,
+        models_dir: str = "models",
+        max_loaded_models: Optional[int] = None,
+        max_cache_bytes: Optional[int] = None,
+        forecast_cache_entries: Optional[int] = None,
+        forecast_cache_ttl: Optional[float] = None,
+        inference_mode: Optional[str] = None,
+        shared_weights: Optional[bool] = None,
+        registry_path: Optional[str] = None
+    ):
         self.models_dir = models_dir
         os.makedirs(self.models_dir, exist_ok=True)
-        self.available_models: Dict[str, TSMixerModel] = {}
-        self.load_all_models()
+        if max_loaded_models is None:
+            max_loaded_models = _env_int("MODEL_CACHE_MAX_MODELS")
+        if max_cache_bytes is None:
+            max_cache_bytes = _env_int("MODEL_CACHE_MAX_BYTES")
+        if forecast_cache_entries is None:
+            forecast_cache_entries = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "1024"))
+        if forecast_cache_ttl is None:
+            forecast_cache_ttl = float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "60"))
+        self.inference_mode = inference_mode or os.getenv("INFERENCE_MODE", "eager")
+        if self.inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"INFERENCE_MODE must be one of {INFERENCE_MODES}, got '{self.inference_mode}'.")
+        if shared_weights is None:
+            shared_weights = os.getenv("SHARED_WEIGHTS", "").lower() in ("1", "true", "yes")
+        self.shared_weights = shared_weights
+        # Checkpoint paths of every known model; instances are deserialized lazily into the cache.
+        self.available_models: Dict[str, str] = {}
+        # Registry version as last seen by this process; forecast cache keys include it.
+        self.model_versions: Dict[str, int] = {}
+        # Checkpoint mtime each registration was made from; a different one on disk means it was replaced.
+        self.checkpoint_mtimes: Dict[str, int] = {}
+        self._versions_lock = threading.Lock()
+        # Index of every checkpoint in models_dir, shared by all processes using the same directory.
+        registry_path = registry_path or os.getenv("MODEL_REGISTRY_PATH") or f"{os.path.normpath(self.models_dir)}.sqlite"
+        self.registry = ModelRegistry(registry_path)
+        self.cache = ModelCache(max_models=max_loaded_models, max_bytes=max_cache_bytes)
+        self.forecast_cache = ForecastCache(max_entries=forecast_cache_entries, ttl_seconds=forecast_cache_ttl)
+        self.discover_models()
 
-    def load_all_models(self):
+    def discover_models(self):
+        # Only file stats are read here; unchanged checkpoints keep their registry version.
         for filename in os.listdir(self.models_dir):
             if filename.endswith(".pt"):
                 model_name = os.path.splitext(filename)[0]
-                model = self.create_model_instance(model_name)
-                if model:
-                    try:
-                        model.load(os.path.join(self.models_dir, filename))
-                        self.available_models[model_name] = model
-                        logging.info(f"'{model_name}' model loaded.")
-                    except Exception as e:
-                        logging.error(f"Failed to load '{model_name}' model: {e}")
+                if model_name.startswith("TSMixer"):
+                    self._register(model_name, os.path.join(self.models_dir, filename), force=False)
+                else:
+                    logging.warning(f"Unknown model name: {model_name}")
+        removed = self.registry.remove_missing(list(self.available_models))
+        if removed:
+            logging.info(f"Removed from model registry (checkpoint deleted): {removed}")
+        logging.info(f"{len(self.available_models)} model checkpoints found.")
 
     def create_model_instance(self, model_name: str) -> Optional[TSMixerModel]:
-        if model_name.startswith("TSMixer"):
+        record = self.registry.get(model_name)
+        model_type = record["model_type"] if record else None
+        if model_type == "TSMixer" or (model_type is None and model_name.startswith("TSMixer")):
             return TSMixerModel()
         else:
             logging.warning(f"Unknown model name: {model_name}")
             return None
 
+    def _register(self, model_name: str, file_path: str, force: bool = True):
+        metadata = self.read_metadata(model_name)
+        mtime_ns = checkpoint_mtime(file_path)
+        version = self.registry.register(
+            model_name,
+            file_path,
+            self.checkpoint_size(file_path),
+            mtime_ns,
+            metadata.get("model_type", "TSMixer"),
+            metadata,
+            force=force
+        )
+        with self._versions_lock:
+            self.available_models[model_name] = file_path
+            self.model_versions[model_name] = version
+            self.checkpoint_mtimes[model_name] = mtime_ns
+        self.forecast_cache.invalidate_model(model_name)
+
+    def _swap_in(self, model_name: str, file_path: str, model: TSMixerModel) -> int:
+        # Called with the model's load lock held, so a slow load of the previous checkpoint cannot
+        # overwrite the new entry. The new instance replaces the cached one in a single step; predictions
+        # already running keep their reference to the previous instance and finish on it.
+        # Instance first, version second: see _versioned_model.
+        self.cache.put(model_name, model, self.checkpoint_size(file_path))
+        self._register(model_name, file_path)
+        return self.model_versions[model_name]
+
+    def _staged_path(self, model_name: str, purpose: str) -> str:
+        # Next to the live checkpoint so os.replace stays on one filesystem; not a `.pt`, so never discovered.
+        return os.path.join(self.models_dir, f".{model_name}.{uuid.uuid4().hex}.{purpose}")
+
+    def _replace_checkpoint(self, model_name: str, staged_path: str) -> str:
+        # Moves a staged checkpoint (and its `.ckpt`, if any) over models/<name>.pt. Called with the model's
+        # load lock held, so requests in this process wait instead of loading or re-registering a half-replaced pair.
+        file_path = os.path.join(self.models_dir, f"{model_name}.pt")
+        if os.path.exists(f"{staged_path}.ckpt"):
+            os.replace(f"{staged_path}.ckpt", f"{file_path}.ckpt")
+        elif os.path.exists(f"{file_path}.ckpt"):
+            # darts would pair the previous checkpoint's weights with the new .pt.
+            os.remove(f"{file_path}.ckpt")
+        os.replace(staged_path, file_path)
+        # A fresh mtime for the complete pair: other workers that caught it between the two renames see
+        # it change again and reload.
+        os.utime(file_path)
+        return file_path
+
+    @staticmethod
+    def _remove_staged(staged_path: str):
+        for path in (staged_path, f"{staged_path}.ckpt"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _publish(self, model_name: str, model: TSMixerModel, metadata: Optional[dict] = None) -> int:
+        # Freshly trained weights are only registered: serving processes (this one included) load them on
+        # the next request and compile or map them there, so a training process never pays for either.
+        # They are saved to a staged path first, so no worker ever reads a half-written checkpoint.
+        staged_path = self._staged_path(model_name, "train")
+        try:
+            model.save(staged_path)
+            with self.cache.load_lock(model_name):
+                file_path = self._replace_checkpoint(model_name, staged_path)
+                if metadata is not None:
+                    self.write_metadata(model_name, metadata)
+                self.cache.invalidate(model_name)
+                self._register(model_name, file_path)
+                return self.model_versions[model_name]
+        finally:
+            self._remove_staged(staged_path)
+
+    def _versioned_model(self, model_name: str) -> Tuple[TSMixerModel, int]:
+        # Versions are bumped only after the new instance is in place, so an unchanged version around
+        # the lookup means the instance is at least that version; forecasts are never cached under a
+        # newer version than the model that computed them.
+        while True:
+            version = self.model_versions.get(model_name)
+            model = self.get_model(model_name)
+            if self.model_versions.get(model_name) == version:
+                return model, version
+
+    def metadata_path(self, model_name: str) -> str:
+        return os.path.join(self.models_dir, f"{model_name}.json")
+
+    def read_metadata(self, model_name: str) -> dict:
+        path = self.metadata_path(model_name)
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_metadata(self, model_name: str, metadata: dict):
+        path = self.metadata_path(model_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def discard_metadata(self, model_name: str):
+        # Uploaded checkpoints carry no metadata; a sidecar left by an earlier training run describes other weights
+        # and its scaler must not be applied to them.
+        path = self.metadata_path(model_name)
+        if os.path.exists(path):
+            os.remove(path)
+            logging.info(f"'{model_name}' metadata from the previous checkpoint discarded.")
+
+    def load_scaler(self, model_name: str) -> Optional[SeriesScaler]:
+        metadata = self.read_metadata(model_name)
+        if not metadata.get("scaler"):
+            return None
+        return SeriesScaler.from_params(metadata["scaler"], columns=metadata.get("columns"))
+
+    def _prepare(self, model_name: str, model: TSMixerModel, file_path: str, mtime_ns: int):
+        # Everything a model needs before serving; cached together with the weights.
+        # `mtime_ns` is the checkpoint mtime read before the weights were loaded.
+        model.scaler = self.load_scaler(model_name)
+        if self.shared_weights:
+            try:
+                map_weights(model.model.model, file_path, mtime_ns)
+            except Exception as e:
+                logging.warning(f"'{model_name}' model keeps private weights: {e}")
+        if self.inference_mode != "eager":
+            try:
+                model.compile(quantize=self.inference_mode == "quantized")
+            except Exception as e:
+                logging.warning(f"'{model_name}' model is served in eager mode: {e}")
+
+    def checkpoint_size(self, file_path: str) -> int:
+        size = 0
+        for path in (file_path, f"{file_path}.ckpt"):
+            if os.path.exists(path):
+                size += os.path.getsize(path)
+        return size
+
+    def _read_checkpoint(self, model_name: str) -> TSMixerModel:
+        model = self.create_model_instance(model_name)
+        if not model:
+            raise ValueError(f"Unsupported model type: {model_name}")
+        model.load(self.available_models[model_name])
+        return model
+
+    def _load_from_disk(self, model_name: str) -> Tuple[TSMixerModel, int]:
+        file_path = self.available_models[model_name]
+        started = time.perf_counter()
+        try:
+            mtime_ns = checkpoint_mtime(file_path)
+            model = self._read_checkpoint(model_name)
+            self._prepare(model_name, model, file_path, mtime_ns)
+        except Exception as e:
+            logging.error(f"Failed to load '{model_name}' model: {e}")
+            raise
+        load_seconds = time.perf_counter() - started
+        self.registry.record_load(model_name, load_seconds, model.input_chunk_length, model.output_chunk_length)
+        logging.info(f"'{model_name}' model loaded in {load_seconds:.2f}s.")
+        return model, self.registry.file_size(model_name) or self.checkpoint_size(file_path)
+
+    def _checkpoint_changed(self, model_name: str, file_path: str) -> bool:
+        try:
+            return checkpoint_mtime(file_path) != self.checkpoint_mtimes.get(model_name)
+        except ValueError:
+            # Neither file exists: deleted, or between the renames of an install in another process.
+            return False
+
+    def _sync_checkpoint(self, model_name: str, file_path: str):
+        # A checkpoint replaced in place by another worker (training, upload) is re-registered and the cached
+        # instance dropped, so the next request loads the new weights. Costs two stat calls per lookup.
+        if not self._checkpoint_changed(model_name, file_path):
+            return
+        with self.cache.load_lock(model_name):
+            if not self._checkpoint_changed(model_name, file_path):
+                return
+            self.cache.invalidate(model_name)
+            self._register(model_name, file_path, force=False)
+        logging.info(f"'{model_name}' checkpoint changed on disk; it will be reloaded.")
+
+    def _resolve(self, model_name: str) -> str:
+        if model_name in self.available_models:
+            self._sync_checkpoint(model_name, self.available_models[model_name])
+        else:
+            # Another worker process may have uploaded or trained it since this one started.
+            file_path = os.path.join(self.models_dir, f"{model_name}.pt")
+            if model_name.startswith("TSMixer") and os.path.exists(file_path):
+                self._register(model_name, file_path, force=False)
+        if model_name not in self.available_models:
+            logging.error(f"Model not loaded: {model_name}")
+            raise ValueError(f"Model not loaded: {model_name}")
+        return self.available_models[model_name]
+
+    def model_version(self, model_name: str) -> int:
+        # Known from the registry without deserializing the checkpoint.
+        self._resolve(model_name)
+        return self.model_versions[model_name]
+
+    def get_model(self, model_name: str) -> TSMixerModel:
+        self._resolve(model_name)
+        return self.cache.get_or_load(
+            model_name,
+            lambda: self._load_from_disk(model_name),
+            expected_size=lambda: self.registry.file_size(model_name)
+        )
+
     def train_model(
         self,
         model_name: str,
-        series: TimeSeries,
-        model_kwargs: Optional[dict] = None
+        series: Union[TimeSeries, Sequence[TimeSeries]],
+        model_kwargs: Optional[dict] = None,
+        callbacks: Optional[list] = None,
+        metadata: Optional[dict] = None
     ):
         if not model_name.startswith("TSMixer"):
             raise ValueError("Only TSMixer models are supported.")
 
         model = TSMixerModel(**model_kwargs) if model_kwargs else TSMixerModel()
-        model.train(series)
-        model_filepath = os.path.join(self.models_dir, f"{model_name}.pt")
-        model.save(model_filepath)
-        self.available_models[model_name] = model
+        model.train(series, callbacks=callbacks)
+        if metadata is not None:
+            metadata = {
+                **metadata,
+                "model_type": "TSMixer",
+                "input_chunk_length": model.input_chunk_length,
+                "output_chunk_length": model.output_chunk_length
+            }
+        self._publish(model_name, model, metadata)
         logging.info(f"'{model_name}' model trained and saved.")
 
+    def fine_tune_model(
+        self,
+        model_name: str,
+        series: Union[TimeSeries, Sequence[TimeSeries]],
+        epochs: int,
+        callbacks: Optional[list] = None,
+        metadata: Optional[dict] = None
+    ):
+        if model_name not in self.available_models:
+            raise ValueError(f"Model not found: {model_name}")
+
+        # A private copy is tuned so in-flight predictions keep using the cached instance.
+        model = self._read_checkpoint(model_name)
+        model.fine_tune(series, epochs, callbacks=callbacks)
+        if metadata is not None:
+            metadata = {**self.read_metadata(model_name), **metadata}
+        self._publish(model_name, model, metadata)
+        logging.info(f"'{model_name}' model fine-tuned for {epochs} epochs and saved.")
+
     def predict(
         self,
         model_name: str,
@@ -54,19 +333,83 @@ class ModelManager:
         n: int = 1
     ) -> TimeSeries:
         logging.info(f"Prediction request: model name={model_name}, prediction length={n}")
-        model = self.available_models.get(model_name)
-        if not model:
-            logging.error(f"Model not loaded: {model_name}")
-            raise ValueError(f"Model not loaded: {model_name}")
+        # Looked up before the model is fetched, so a hit never pays for deserializing an evicted checkpoint.
+        key = self.forecast_cache.make_key(model_name, self.model_version(model_name), series, n)
+        prediction = self.forecast_cache.get(key)
+        if prediction is not None:
+            return prediction
+
+        model, version = self._versioned_model(model_name)
 
         if not isinstance(model, TSMixerModel):
             logging.error("Unsupported model type.")
             raise ValueError("Unsupported model type.")
 
+        if version != key[1]:
+            key = self.forecast_cache.make_key(model_name, version, series, n)
         prediction = model.predict(series, n)
+        self.forecast_cache.put(key, prediction)
         logging.info(f"Prediction result: {prediction}")
         return prediction
 
+    def predict_batch(
+        self,
+        model_name: str,
+        series_list: Sequence[TimeSeries],
+        n: int = 1
+    ) -> List[TimeSeries]:
+        logging.info(f"Batch prediction request: model name={model_name}, series count={len(series_list)}, prediction length={n}")
+        version = self.model_version(model_name)
+        keys = [self.forecast_cache.make_key(model_name, version, series, n) for series in series_list]
+        predictions = [self.forecast_cache.get(key) for key in keys]
+        missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+        if missing:
+            model, loaded_version = self._versioned_model(model_name)
+
+            if not isinstance(model, TSMixerModel):
+                logging.error("Unsupported model type.")
+                raise ValueError("Unsupported model type.")
+
+            if loaded_version != version:
+                for i in missing:
+                    keys[i] = self.forecast_cache.make_key(model_name, loaded_version, series_list[i], n)
+            computed = model.predict_batch([series_list[i] for i in missing], n)
+            for i, prediction in zip(missing, computed):
+                predictions[i] = prediction
+                self.forecast_cache.put(keys[i], prediction)
+        return predictions
+
+    def install_model(
+        self,
+        model_name: str,
+        staged_path: str,
+        model_type: str = "TSMixer",
+        model_kwargs: Optional[dict] = None
+    ) -> int:
+        # The staged checkpoint (and its `.ckpt`, if any) is loaded and validated before anything
+        # visible changes, then moved over models/<name>.pt and swapped in under a new version.
+        if model_type != "TSMixer":
+            raise ValueError(f"Unsupported model type: {model_type}")
+        if not model_name.startswith("TSMixer"):
+            raise ValueError("Model name must start with 'TSMixer_'.")
+
+        model = TSMixerModel(**model_kwargs) if model_kwargs else TSMixerModel()
+        try:
+            model.load(staged_path)
+        except Exception as e:
+            logging.error(f"Failed to load '{model_name}' model: {e}")
+            raise ValueError(f"Invalid checkpoint: {e}")
+        if getattr(model.model, "model", None) is None:
+            raise ValueError("Checkpoint contains no network weights; upload its .ckpt file as well.")
+
+        with self.cache.load_lock(model_name):
+            file_path = self._replace_checkpoint(model_name, staged_path)
+            self.discard_metadata(model_name)
+            self._prepare(model_name, model, file_path, checkpoint_mtime(file_path))
+            version = self._swap_in(model_name, file_path, model)
+        logging.info(f"'{model_name}' model installed as version {version}.")
+        return version
+
     def load_model(self, model_name: str, file_path: str, model_type: str, model_kwargs: Optional[dict] = None):
         if model_type == "TSMixer":
             if not model_name.startswith("TSMixer"):
@@ -74,8 +417,12 @@ class ModelManager:
 
             model = TSMixerModel(**model_kwargs) if model_kwargs else TSMixerModel()
             try:
-                model.load(file_path)
-                self.available_models[model_name] = model
+                with self.cache.load_lock(model_name):
+                    mtime_ns = checkpoint_mtime(file_path)
+                    model.load(file_path)
+                    self.discard_metadata(model_name)
+                    self._prepare(model_name, model, file_path, mtime_ns)
+                    self._swap_in(model_name, file_path, model)
                 logging.info(f"'{model_name}' model loaded.")
             except Exception as e:
                 logging.error(f"Failed to load '{model_name}' model: {e}")
@@ -83,5 +430,30 @@ class ModelManager:
         else:
             raise ValueError(f"Unsupported model type: {model_type}")
 
+    def refresh_model(self, model_name: str):
+        # Picks up a checkpoint written by another process; the next prediction reloads it.
+        file_path = os.path.join(self.models_dir, f"{model_name}.pt")
+        if not os.path.exists(file_path):
+            raise ValueError(f"Checkpoint not found: {file_path}")
+        with self.cache.load_lock(model_name):
+            self.cache.invalidate(model_name)
+            self._register(model_name, file_path, force=False)
+        logging.info(f"'{model_name}' model checkpoint refreshed.")
+
     def list_models(self) -> list:
-        return list(self.available_models.keys())
+        # Answered from the registry; no checkpoint file is opened.
+        return self.registry.names()
+
+    def model_records(self) -> List[dict]:
+        return self.registry.list()
+
+    def model_record(self, model_name: str) -> Optional[dict]:
+        return self.registry.get(model_name)
+
+    def cache_stats(self) -> dict:
+        stats = self.cache.stats()
+        stats["available_models"] = len(self.available_models)
+        return stats
+
+    def forecast_cache_stats(self) -> dict:
+        return self.forecast_cache.stats()
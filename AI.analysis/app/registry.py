@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+COLUMNS = (
+    "name", "version", "model_type", "file_path", "file_size", "file_mtime_ns",
+    "input_chunk_length", "output_chunk_length", "trained_from", "trained_until", "trained_at",
+    "columns", "scaler", "load_seconds", "registered_at",
+)
+JSON_COLUMNS = ("columns", "scaler")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    model_type TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    file_mtime_ns INTEGER NOT NULL,
+    input_chunk_length INTEGER,
+    output_chunk_length INTEGER,
+    trained_from TEXT,
+    trained_until TEXT,
+    trained_at TEXT,
+    columns TEXT,
+    scaler TEXT,
+    load_seconds REAL,
+    registered_at TEXT NOT NULL
+)
+"""
+
+
+class ModelRegistry:
+    """SQLite index of model checkpoints: version, training window, scaler, chunk lengths, size and load time."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            # WAL lets every serving worker read while one of them registers a new version.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        for column in JSON_COLUMNS:
+            if record[column] is not None:
+                record[column] = json.loads(record[column])
+        return record
+
+    def get(self, name: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM models WHERE name = ?", (name,)).fetchone()
+        return self._to_record(row) if row else None
+
+    def list(self) -> List[dict]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM models ORDER BY name").fetchall()
+        return [self._to_record(row) for row in rows]
+
+    def names(self) -> List[str]:
+        with self._connect() as conn:
+            return [row["name"] for row in conn.execute("SELECT name FROM models ORDER BY name")]
+
+    def register(
+        self,
+        name: str,
+        file_path: str,
+        file_size: int,
+        file_mtime_ns: int,
+        model_type: str,
+        metadata: Optional[dict] = None,
+        force: bool = False
+    ) -> int:
+        # The version only moves when the checkpoint on disk changed (or a swap forces it), so every
+        # worker re-scanning the same directory agrees on it.
+        metadata = metadata or {}
+        fields = {
+            "name": name,
+            "model_type": model_type,
+            "file_path": file_path,
+            "file_size": file_size,
+            "file_mtime_ns": file_mtime_ns,
+            "input_chunk_length": metadata.get("input_chunk_length"),
+            "output_chunk_length": metadata.get("output_chunk_length"),
+            "trained_from": metadata.get("trained_from"),
+            "trained_until": metadata.get("trained_until"),
+            "trained_at": metadata.get("trained_at"),
+            "columns": json.dumps(metadata["columns"]) if metadata.get("columns") else None,
+            "scaler": json.dumps(metadata["scaler"]) if metadata.get("scaler") else None,
+        }
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT * FROM models WHERE name = ?", (name,)).fetchone()
+            if row is not None and not force and (row["file_size"], row["file_mtime_ns"]) == (file_size, file_mtime_ns):
+                # Unchanged checkpoint: version, load time and values learnt on load are kept.
+                record = {column: row[column] for column in COLUMNS}
+                record.update({column: value for column, value in fields.items() if value is not None})
+            else:
+                record = {
+                    **fields,
+                    "version": row["version"] + 1 if row else 1,
+                    "load_seconds": None,
+                    "registered_at": datetime.now().isoformat(timespec="seconds"),
+                }
+            version = record["version"]
+            conn.execute(
+                f"INSERT OR REPLACE INTO models ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join(':' + column for column in COLUMNS)})",
+                record
+            )
+        return version
+
+    def record_load(
+        self,
+        name: str,
+        load_seconds: float,
+        input_chunk_length: Optional[int] = None,
+        output_chunk_length: Optional[int] = None
+    ):
+        # Uploaded checkpoints have no metadata sidecar; their chunk lengths are learnt on first load.
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE models SET load_seconds = ?, "
+                "input_chunk_length = COALESCE(input_chunk_length, ?), "
+                "output_chunk_length = COALESCE(output_chunk_length, ?) WHERE name = ?",
+                (load_seconds, input_chunk_length, output_chunk_length, name)
+            )
+
+    def remove_missing(self, existing: List[str]) -> List[str]:
+        existing = set(existing)
+        with self._lock, self._connect() as conn:
+            stale = [row["name"] for row in conn.execute("SELECT name FROM models") if row["name"] not in existing]
+            conn.executemany("DELETE FROM models WHERE name = ?", [(name,) for name in stale])
+        return stale
+
+    def file_size(self, name: str) -> Optional[int]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT file_size FROM models WHERE name = ?", (name,)).fetchone()
+        return row["file_size"] if row else None
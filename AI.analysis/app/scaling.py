@@ -0,0 +1,64 @@
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from darts import TimeSeries
+
+
+class SeriesScaler:
+    """Standard-scaling parameters of one model, applied to darts series as broadcast array operations."""
+
+    def __init__(self, columns: Sequence[str], mean: Sequence[float], scale: Sequence[float]):
+        self.columns: List[str] = list(columns)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self._positions = {column: i for i, column in enumerate(self.columns)}
+
+    @classmethod
+    def from_params(cls, params: dict, columns: Optional[Sequence[str]] = None) -> "SeriesScaler":
+        # Per-column models share the scaler fitted over all tanks; keep only their own columns.
+        all_columns = list(params["columns"])
+        columns = list(columns) if columns else all_columns
+        index = [all_columns.index(column) for column in columns]
+        return cls(
+            columns,
+            np.asarray(params["mean"], dtype=np.float64)[index],
+            np.asarray(params["scale"], dtype=np.float64)[index]
+        )
+
+    def to_params(self) -> dict:
+        return {"columns": self.columns, "mean": self.mean.tolist(), "scale": self.scale.tolist()}
+
+    def _params_for(self, series: TimeSeries) -> Tuple[np.ndarray, np.ndarray]:
+        components = list(series.components)
+        if all(component in self._positions for component in components):
+            index = [self._positions[component] for component in components]
+            return self.mean[index], self.scale[index]
+        if len(self.columns) == 1:
+            return np.repeat(self.mean, len(components)), np.repeat(self.scale, len(components))
+        if is_unnamed(components):
+            if len(components) == len(self.columns):
+                return self.mean, self.scale
+            # e.g. a single unnamed series sent to a model trained on several tanks: there is no way to tell
+            # which tank it is, and forecasting it unscaled would answer in standardized units.
+            raise ValueError(
+                f"Series has {len(components)} unnamed column(s) but the model was trained on {self.columns}. "
+                "Send `columns` naming the tank of each value column."
+            )
+        raise ValueError(
+            f"Cannot match series components {components} to scaler columns {self.columns}. "
+            "Name the series columns after the tanks the model was trained on."
+        )
+
+    def transform(self, series: TimeSeries) -> TimeSeries:
+        mean, scale = self._params_for(series)
+        values = series.values(copy=False)
+        return series.with_values(((values - mean) / scale).astype(values.dtype, copy=False))
+
+    def inverse_transform(self, series: TimeSeries) -> TimeSeries:
+        mean, scale = self._params_for(series)
+        values = series.values(copy=False)
+        return series.with_values((values * scale + mean).astype(values.dtype, copy=False))
+
+
+def is_unnamed(components: Sequence[str]) -> bool:
+    # darts names the components of a series built without `columns` "0", "1", ...
+    return list(components) == [str(i) for i in range(len(components))]
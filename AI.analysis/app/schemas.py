@@ -1,14 +1,93 @@
+from datetime import datetime
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 class ModelUploadResponse(BaseModel):
     model_name: str
     message: str
+    version: Optional[int] = None
 
 class PredictRequest(BaseModel):
     model_name: str
-    series: Optional[Dict[str, List]] = None
+    series: Optional[Dict[str, Any]] = None
     freq: Optional[str] = None
 
 class PredictResponse(BaseModel):
     series_prediction: Optional[Dict[str, Dict[str, List]]] = None
+
+class BatchPredictItem(BaseModel):
+    model_name: str
+    series: Dict[str, Any]
+    horizon: int = 1
+    freq: Optional[str] = None
+
+class BatchPredictRequest(BaseModel):
+    items: List[BatchPredictItem]
+
+class BatchPredictResult(BaseModel):
+    model_name: str
+    series_prediction: Optional[Dict[str, List]] = None
+    error: Optional[str] = None
+
+class BatchPredictResponse(BaseModel):
+    results: List[BatchPredictResult]
+
+class TrainJobResponse(BaseModel):
+    job_id: str
+    status: str
+
+class TrainJobStatus(BaseModel):
+    job_id: str
+    model_name: str
+    status: str
+    epoch: int = 0
+    n_epochs: Optional[int] = None
+    loss: Optional[float] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+class ThresholdItem(BaseModel):
+    model_name: str
+    series: Dict[str, Any]
+    thresholds: List[float]
+    horizon: int = 12
+    freq: Optional[str] = None
+    label: Optional[str] = None
+
+class ThresholdRequest(BaseModel):
+    items: List[ThresholdItem]
+
+class ThresholdEstimate(BaseModel):
+    column: str
+    threshold: float
+    minutes_until: Optional[float] = None
+    crossing_time: Optional[datetime] = None
+
+class ThresholdResult(BaseModel):
+    model_name: str
+    label: Optional[str] = None
+    series_prediction: Optional[Dict[str, List]] = None
+    estimates: List[ThresholdEstimate] = []
+    error: Optional[str] = None
+
+class ThresholdResponse(BaseModel):
+    results: List[ThresholdResult]
+
+class ModelRecord(BaseModel):
+    name: str
+    version: int
+    model_type: str
+    file_path: str
+    file_size: int
+    input_chunk_length: Optional[int] = None
+    output_chunk_length: Optional[int] = None
+    trained_from: Optional[str] = None
+    trained_until: Optional[str] = None
+    trained_at: Optional[str] = None
+    columns: Optional[List[str]] = None
+    scaler: Optional[Dict[str, List]] = None
+    load_seconds: Optional[float] = None
+    registered_at: str
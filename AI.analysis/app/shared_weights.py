@@ -0,0 +1,50 @@
+import glob
+import logging
+import os
+import torch
+
+
+def weights_path(checkpoint_path: str, mtime_ns: int) -> str:
+    # Keyed by the checkpoint's mtime, so a worker still holding an older checkpoint never maps (or overwrites)
+    # the weights exported from a newer one.
+    return f"{checkpoint_path}.{mtime_ns}.weights"
+
+
+def checkpoint_mtime(checkpoint_path: str) -> int:
+    return max(
+        os.stat(path).st_mtime_ns
+        for path in (checkpoint_path, f"{checkpoint_path}.ckpt")
+        if os.path.exists(path)
+    )
+
+
+def export_weights(module: torch.nn.Module, path: str):
+    # Plain state_dict in torch's zip format: every tensor is stored uncompressed and page aligned, so it can be mmapped.
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    torch.save(module.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+    logging.info(f"Weights exported for memory mapping: {path}")
+
+
+def remove_stale_weights(checkpoint_path: str, keep: str):
+    # Workers still mapping an older file keep their mapping; the file is freed once the last one drops it.
+    for path in glob.glob(f"{glob.escape(checkpoint_path)}.*weights"):
+        if path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def map_weights(module: torch.nn.Module, checkpoint_path: str, mtime_ns: int):
+    # Parameters are re-pointed at a read-only mapping of the exported file. Every worker process mapping the
+    # same file shares one copy in the OS page cache instead of holding private tensors.
+    # `mtime_ns` is the checkpoint mtime read before `module` was loaded from it.
+    path = weights_path(checkpoint_path, mtime_ns)
+    if not os.path.exists(path):
+        if checkpoint_mtime(checkpoint_path) != mtime_ns:
+            raise ValueError("Checkpoint changed while it was being loaded.")
+        export_weights(module, path)
+        remove_stale_weights(checkpoint_path, keep=path)
+    state_dict = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    module.load_state_dict(state_dict, assign=True)
@@ -1,8 +1,16 @@
+import argparse
 import logging
+import multiprocessing
 import os
-from data.get_from_mongodb import get_data_from_db
-from typing import Optional
-from app.utils import preprocess_data
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from data.get_from_mongodb import get_data_from_db, get_downsampled_data_from_db
+from data.feature_cache import load_cached_data
+from typing import Dict, List, Optional
+import pandas as pd
+from darts import TimeSeries
+from app.utils import preprocess_data, scaler_from_params, scaler_params
 from app.model_manager import ModelManager
 
 def setup_logging():
@@ -15,23 +23,236 @@ def setup_logging():
         encoding='utf-8'
     )
 
-def train_model(model_name: str, model_type: str, model_kwargs: Optional[dict] = None):
+def load_training_data(server_downsample: bool = False, use_cache: bool = False) -> pd.DataFrame:
+    # 로컬 피처 캐시는 새 데이터만 동기화한 뒤 메모리 매핑으로 읽습니다.
+    if use_cache:
+        return load_cached_data()
+    # 서버 집계 시 10분 단위로 줄어든 데이터만 전송됩니다.
+    if server_downsample:
+        return get_downsampled_data_from_db(bin_minutes=10)
+    return get_data_from_db()
+
+def hold_out(df: pd.DataFrame, holdout_days: float = 0) -> pd.DataFrame:
+    # 마지막 holdout_days일은 학습에서 제외합니다. trained_until이 그 앞에서 끝나므로 백테스트가 이 구간을 평가합니다.
+    if not holdout_days:
+        return df
+    cutoff = df.index.max() - pd.Timedelta(days=holdout_days)
+    df = df[df.index <= cutoff]
+    if df.empty:
+        raise ValueError(f"holdout_days={holdout_days}를 제외하면 학습할 데이터가 없습니다.")
+    logging.info(f"{cutoff} 이후 {holdout_days}일 구간을 백테스트용으로 학습에서 제외합니다.")
+    return df
+
+def training_metadata(df: pd.DataFrame, scaler, columns: List[str], multivariate: bool = False) -> dict:
+    return {
+        "trained_from": df.index.min().isoformat(),
+        "trained_until": df.index.max().isoformat(),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "columns": list(columns),
+        "multivariate": multivariate,
+        "scaler": scaler_params(scaler)
+    }
+
+def train_model(
+    model_name: str,
+    model_type: str,
+    model_kwargs: Optional[dict] = None,
+    callbacks: Optional[list] = None,
+    multivariate: bool = False,
+    server_downsample: bool = False,
+    use_cache: bool = False,
+    holdout_days: float = 0
+):
     try:
-        df = get_data_from_db()
+        if model_type != "TSMixer":
+            raise ValueError(f"Unsupported model type: {model_type}")
+
+        df = hold_out(load_training_data(server_downsample, use_cache), holdout_days)
 
-        series_dict, _ = preprocess_data(df)
+        series_dict, scaler = preprocess_data(df, multivariate=multivariate)
 
         manager = ModelManager()
 
-        manager.train_model(model_name, series_dict, model_type, model_kwargs)
+        if multivariate:
+            # One model over all tank columns, served with a single forward pass per farm.
+            series = series_dict["multivariate"]
+        else:
+            series = list(series_dict.values())
+        metadata = training_metadata(df, scaler, scaler.feature_names_in_, multivariate)
+        manager.train_model(model_name, series, model_kwargs, callbacks=callbacks, metadata=metadata)
         logging.info(f"{model_name} 모델 학습 완료.")
 
     except Exception as e:
         logging.error(f"모델 학습 중 오류 발생: {e}")
         raise
 
+def column_model_name(column: str, prefix: str = "TSMixer") -> str:
+    return f"{prefix}_{re.sub(r'[^0-9A-Za-z]+', '_', column).strip('_')}"
+
+def _train_series_model(
+    model_name: str,
+    series: TimeSeries,
+    model_kwargs: Optional[dict],
+    models_dir: str,
+    torch_threads: int,
+    metadata: Optional[dict] = None
+) -> str:
+    import torch
+    torch.set_num_threads(torch_threads)
+
+    manager = ModelManager(models_dir=models_dir)
+    manager.train_model(model_name, series, model_kwargs, metadata=metadata)
+    return model_name
+
+def train_models_parallel(
+    series_dict: Dict[str, TimeSeries],
+    model_kwargs: Optional[dict] = None,
+    prefix: str = "TSMixer",
+    max_workers: Optional[int] = None,
+    models_dir: str = "models",
+    metadata: Optional[dict] = None
+) -> List[str]:
+    if not series_dict:
+        logging.warning("학습할 시계열이 없습니다.")
+        return []
+    cpu_count = os.cpu_count() or 1
+    max_workers = max_workers or min(len(series_dict), cpu_count)
+    # Split the cores between workers so parallel fits do not oversubscribe the CPU.
+    torch_threads = max(1, cpu_count // max_workers)
+
+    trained, failed = [], []
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(
+                _train_series_model,
+                column_model_name(key, prefix),
+                series,
+                model_kwargs,
+                models_dir,
+                torch_threads,
+                {**metadata, "columns": [key]} if metadata else None
+            ): key
+            for key, series in series_dict.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                trained.append(future.result())
+                logging.info(f"{key} 모델 학습 완료.")
+            except Exception as e:
+                failed.append(key)
+                logging.error(f"{key} 모델 학습 중 오류 발생: {e}")
+
+    if failed:
+        raise RuntimeError(f"모델 학습 실패: {failed}")
+    return trained
+
+def train_per_column_models(
+    model_kwargs: Optional[dict] = None,
+    prefix: str = "TSMixer",
+    max_workers: Optional[int] = None,
+    server_downsample: bool = False,
+    use_cache: bool = False,
+    holdout_days: float = 0
+) -> List[str]:
+    df = hold_out(load_training_data(server_downsample, use_cache), holdout_days)
+    series_dict, scaler = preprocess_data(df)
+    metadata = training_metadata(df, scaler, scaler.feature_names_in_)
+    return train_models_parallel(
+        series_dict, model_kwargs, prefix=prefix, max_workers=max_workers, metadata=metadata
+    )
+
+def fine_tune_model(model_name: str, epochs: int = 5, callbacks: Optional[list] = None) -> bool:
+    try:
+        manager = ModelManager()
+        metadata = manager.read_metadata(model_name)
+        if not metadata.get("trained_until") or not metadata.get("scaler") or not metadata.get("input_chunk_length"):
+            raise ValueError(f"{model_name} 모델의 학습 워터마크가 없습니다. 전체 학습을 먼저 실행하세요.")
+
+        watermark = pd.Timestamp(metadata["trained_until"])
+        # 새 데이터의 첫 학습 구간을 만들 수 있도록 워터마크 이전 구간을 함께 가져옵니다.
+        window = metadata["input_chunk_length"] + metadata["output_chunk_length"]
+        lookback = pd.Timedelta(minutes=10) * window
+        df = get_data_from_db(start=(watermark - lookback).to_pydatetime())
+        if df.empty or df.index.max() <= watermark:
+            logging.info(f"{model_name} 모델: 새 데이터가 없어 증분 학습을 건너뜁니다.")
+            return False
+
+        multivariate = metadata.get("multivariate", False)
+        series_dict, _ = preprocess_data(
+            df,
+            multivariate=multivariate,
+            scaler=scaler_from_params(metadata["scaler"])
+        )
+        if multivariate:
+            series = series_dict["multivariate"]
+        else:
+            series = [series_dict[column] for column in metadata["columns"]]
+
+        manager.fine_tune_model(
+            model_name,
+            series,
+            epochs,
+            callbacks=callbacks,
+            # trained_from는 최초 학습 시작 시점을 유지합니다 (증분 데이터는 워터마크 이전 구간부터 조회됩니다).
+            metadata={
+                "trained_until": df.index.max().isoformat(),
+                "trained_at": datetime.now().isoformat(timespec="seconds")
+            }
+        )
+        logging.info(f"{model_name} 모델 증분 학습 완료 ({watermark} 이후 데이터).")
+        return True
+
+    except Exception as e:
+        logging.error(f"모델 증분 학습 중 오류 발생: {e}")
+        raise
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train TSMixer models from MongoDB sensor data.")
+    parser.add_argument("--mode", choices=["single", "per-column", "multivariate", "finetune"], default="single")
+    parser.add_argument("--model-name", default="TSMixer")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--epochs", type=int, default=5, help="Epochs for --mode finetune.")
+    parser.add_argument(
+        "--server-downsample",
+        action="store_true",
+        help="Bucket readings to 10 minutes in a MongoDB aggregation before transfer."
+    )
+    parser.add_argument(
+        "--feature-cache",
+        action="store_true",
+        help="Sync and read training data from the local Arrow feature cache."
+    )
+    parser.add_argument(
+        "--holdout-days",
+        type=float,
+        default=0,
+        help="Leave the last N days out of training so `app.backtest` can score them out of sample."
+    )
+    args = parser.parse_args()
+
     setup_logging()
     logging.info("모델 학습 시작")
-    train_model("XGBoost", "XGBoost", {"input_chunk_length": 24, "output_chunk_length": 12, "n_epochs": 30})
+    model_kwargs = {"input_chunk_length": 24, "output_chunk_length": 12, "n_epochs": 30}
+    if args.mode == "finetune":
+        fine_tune_model(args.model_name, epochs=args.epochs)
+    elif args.mode == "per-column":
+        train_per_column_models(
+            model_kwargs,
+            prefix=args.model_name,
+            max_workers=args.workers,
+            server_downsample=args.server_downsample,
+            use_cache=args.feature_cache,
+            holdout_days=args.holdout_days
+        )
+    else:
+        train_model(
+            args.model_name,
+            "TSMixer",
+            model_kwargs,
+            multivariate=args.mode == "multivariate",
+            server_downsample=args.server_downsample,
+            use_cache=args.feature_cache,
+            holdout_days=args.holdout_days
+        )
     logging.info("모델 학습 종료")
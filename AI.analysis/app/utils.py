@@ -1,29 +1,99 @@
+import io
+import numpy as np
 import pandas as pd
 import logging
+from typing import Any, Dict, List, Optional
 from sklearn.preprocessing import StandardScaler
 from darts import TimeSeries
 
-def preprocess_data(df: pd.DataFrame) -> tuple:
+def scaler_params(scaler: StandardScaler) -> dict:
+    return {
+        "columns": list(scaler.feature_names_in_),
+        "mean": scaler.mean_.tolist(),
+        "scale": scaler.scale_.tolist()
+    }
+
+def scaler_from_params(params: dict) -> StandardScaler:
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(params["mean"], dtype=float)
+    scaler.scale_ = np.asarray(params["scale"], dtype=float)
+    scaler.var_ = scaler.scale_ ** 2
+    scaler.n_features_in_ = len(scaler.mean_)
+    scaler.feature_names_in_ = np.asarray(params["columns"], dtype=object)
+    scaler.n_samples_seen_ = 0
+    return scaler
+
+RESAMPLE_FREQ = '10T'
+RESAMPLE_STEP_NS = 10 * 60 * 10**9
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    # 각 위치에서 직전의 유효한 행 번호를 누적 최댓값으로 구해 한 번에 채웁니다.
+    rows = np.where(mask, 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+def preprocess_data(
+    df: pd.DataFrame,
+    multivariate: bool = False,
+    scaler: Optional[StandardScaler] = None
+) -> tuple:
     try:
-        if not df.index.is_unique:
+        if df.empty:
+            raise ValueError("전처리할 데이터가 없습니다.")
+
+        columns = list(scaler.feature_names_in_) if scaler is not None else list(df.columns)
+        timestamps = df.index.values.astype("datetime64[ns]").view("i8")
+        values = df[columns].to_numpy(dtype=np.float32)
+
+        if len(timestamps) > 1 and not (timestamps[1:] >= timestamps[:-1]).all():
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+
+        keep = np.ones(len(timestamps), dtype=bool)
+        keep[1:] = timestamps[1:] != timestamps[:-1]
+        if not keep.all():
             logging.warning("인덱스에 중복된 타임스탬프가 있습니다. 중복을 제거합니다.")
-            df = df[~df.index.duplicated(keep='first')]
+            timestamps, values = timestamps[keep], values[keep]
 
-        df.fillna(method='ffill', inplace=True)
+        values = _forward_fill(values)
 
-        df = df.resample('10T').ffill()
+        # 10분 격자의 각 시점에 그 시점 이전의 마지막 관측값을 할당합니다 (resample('10T').ffill()과 동일).
+        first = timestamps[0] - timestamps[0] % RESAMPLE_STEP_NS
+        grid = np.arange(first, timestamps[-1] + 1, RESAMPLE_STEP_NS, dtype=np.int64)
+        positions = np.searchsorted(timestamps, grid, side="right") - 1
+        # 열 우선 배열이므로 열별 TimeSeries가 복사 없이 연속된 뷰를 공유합니다.
+        resampled = np.empty((len(grid), len(columns)), dtype=np.float32, order="F")
+        np.take(values, np.maximum(positions, 0), axis=0, out=resampled)
+        resampled[positions < 0] = np.nan
 
-        scaler = StandardScaler()
-        scaled_data = scaler.fit_transform(df)
-        scaled_df = pd.DataFrame(scaled_data, index=df.index, columns=df.columns)
+        if scaler is None:
+            mean = np.nanmean(resampled, axis=0, dtype=np.float64)
+            scale = np.nanstd(resampled, axis=0, dtype=np.float64)
+            scale[scale == 0.0] = 1.0
+            scaler = scaler_from_params({"columns": columns, "mean": mean.tolist(), "scale": scale.tolist()})
+            scaler.n_samples_seen_ = int(np.count_nonzero(~np.isnan(resampled[:, 0])))
+        else:
+            # 증분 학습 시 기존 스케일러를 그대로 적용합니다.
+            mean, scale = scaler.mean_, scaler.scale_
+        resampled -= mean.astype(np.float32)
+        resampled /= scale.astype(np.float32)
+
+        times = pd.DatetimeIndex(grid.view("datetime64[ns]"), freq=RESAMPLE_FREQ, name=df.index.name)
 
         series_dict = {}
-        for column in scaled_df.columns:
-            series_dict[column] = TimeSeries.from_dataframe(
-                scaled_df,
-                value_cols=column,
-                fill_missing_dates=True,
-                freq='10T'
+        if multivariate:
+            series_dict["multivariate"] = TimeSeries.from_times_and_values(
+                times, resampled, freq=RESAMPLE_FREQ, columns=columns
+            )
+            logging.info("데이터 전처리 및 다변량 TimeSeries 객체 변환 완료.")
+            return series_dict, scaler
+
+        for j, column in enumerate(columns):
+            series_dict[column] = TimeSeries.from_times_and_values(
+                times, resampled[:, j:j + 1], freq=RESAMPLE_FREQ, columns=[column]
             )
 
         logging.info("데이터 전처리 및 TimeSeries 객체 변환 완료.")
@@ -33,12 +103,143 @@ def preprocess_data(df: pd.DataFrame) -> tuple:
         logging.error(f"데이터 전처리 중 오류 발생: {e}")
         raise
 
+def step_minutes(series: TimeSeries) -> float:
+    return pd.Timedelta(series.freq).total_seconds() / 60
+
+def stack_forecasts(predictions: List[TimeSeries]) -> np.ndarray:
+    # 길이와 열 수가 다른 예측은 +inf로 채워 임계치에 도달하지 않은 것으로 취급합니다.
+    n_steps = max(len(prediction) for prediction in predictions)
+    n_columns = max(prediction.n_components for prediction in predictions)
+    stacked = np.full((len(predictions), n_steps, n_columns), np.inf)
+    for i, prediction in enumerate(predictions):
+        values = prediction.values(copy=False)
+        stacked[i, :values.shape[0], :values.shape[1]] = values
+    return stacked
+
+def threshold_crossings(values: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    # values: (시리즈, 시점, 열), thresholds: (시리즈, 임계치) -> (시리즈, 열, 임계치)별 첫 도달 시점, 없으면 -1.
+    # NaN 임계치는 비교 결과가 항상 거짓이므로 목록 길이를 맞추는 패딩으로 쓸 수 있습니다.
+    below = values[:, :, :, None] <= thresholds[:, None, None, :]
+    first = below.argmax(axis=1)
+    return np.where(below.any(axis=1), first, -1)
+
 def calculate_time_until_threshold(series: TimeSeries, threshold: float) -> int:
     try:
-        for i, value in enumerate(series.values()):
-            if value <= threshold:
-                return i * 10
-        return -1
+        crossings = threshold_crossings(series.values(copy=False)[None], np.array([[threshold]]))
+        index = int(crossings[0, 0, 0])
+        return -1 if index < 0 else int(index * step_minutes(series))
     except Exception as e:
         logging.error(f"임계치 도달 시간 계산 중 오류 발생: {e}")
         raise
+
+def _values_array(values, columns: Optional[List[str]] = None) -> np.ndarray:
+    array = np.asarray(values, dtype=np.float32)
+    if array.ndim == 1:
+        # Flat arrays are time-major: one row of `columns` values per timestamp.
+        array = array.reshape(-1, len(columns) if columns else 1)
+    return array
+
+def _freq_from_steps(epoch_ns: np.ndarray) -> Optional[str]:
+    # Constant-step check on integer timestamps; avoids pd.infer_freq over the whole index.
+    if len(epoch_ns) == 1:
+        logging.info("Single data point, frequency set to 'H'.")
+        return 'H'
+    steps = np.diff(epoch_ns)
+    if steps[0] <= 0 or not (steps == steps[0]).all():
+        raise ValueError("Timestamps must be evenly spaced and increasing, or `freq` must be provided.")
+    return pd.tseries.frequencies.to_offset(pd.Timedelta(int(steps[0]), unit="ns")).freqstr
+
+def _times_from_payload(payload: Dict[str, Any], length: int, freq: Optional[str]):
+    if payload.get("start") is not None:
+        freq = freq or payload.get("freq")
+        if not freq:
+            raise ValueError("`freq` is required together with `start`.")
+        return pd.date_range(start=pd.Timestamp(payload["start"]), periods=length, freq=freq), freq
+
+    if payload.get("time_index_ms") is not None:
+        epoch_ns = np.asarray(payload["time_index_ms"], dtype=np.int64) * 10**6
+        freq = freq or payload.get("freq") or _freq_from_steps(epoch_ns)
+        return pd.DatetimeIndex(epoch_ns.view("datetime64[ns]")), freq
+
+    time_index = payload.get("time_index")
+    if not time_index:
+        logging.error("Missing 'time_index' or 'values' in series data.")
+        raise ValueError("`time_index` and `values` are required in series data.")
+    times = pd.to_datetime(time_index)
+    freq = freq or payload.get("freq")
+    if freq is None:
+        if len(times) == 1:
+            freq = 'H'
+            logging.info("Single data point, frequency set to 'H'.")
+        else:
+            freq = pd.infer_freq(times)
+            if not freq:
+                logging.error("Cannot infer frequency.")
+                raise ValueError("Cannot infer frequency. Please ensure consistent time intervals or provide multiple data points.")
+            logging.info(f"Inferred frequency: {freq}")
+    return times, freq
+
+def _index_cache_key(payload: Dict[str, Any], length: int, freq: Optional[str]) -> tuple:
+    if payload.get("start") is not None:
+        return ("start", str(payload["start"]), payload.get("freq"), length, freq)
+    if payload.get("time_index_ms") is not None:
+        return ("ms", tuple(payload["time_index_ms"]), payload.get("freq"), freq)
+    return ("iso", tuple(payload.get("time_index") or ()), payload.get("freq"), freq)
+
+def series_from_payload(
+    payload: Dict[str, Any],
+    freq: Optional[str] = None,
+    index_cache: Optional[dict] = None
+) -> TimeSeries:
+    # Accepts `time_index` strings, `time_index_ms` epoch millis, or `start` + `freq`;
+    # `values` may be nested rows or a flat time-major array.
+    values = payload.get("values")
+    columns = payload.get("columns")
+    if values is None or len(values) == 0:
+        logging.error("Missing 'time_index' or 'values' in series data.")
+        raise ValueError("`time_index` and `values` are required in series data.")
+    values = _values_array(values, columns)
+
+    # Items of one batch usually share the same window, so the parsed index is reused.
+    cache_key = _index_cache_key(payload, len(values), freq)
+    cached = index_cache.get(cache_key) if index_cache is not None else None
+    if cached is not None:
+        times, freq = cached
+    else:
+        times, freq = _times_from_payload(payload, len(values), freq)
+        if index_cache is not None:
+            index_cache[cache_key] = (times, freq)
+
+    # Named columns let the model pick the matching scaler parameters for each tank.
+    return TimeSeries.from_times_and_values(times, values, freq=freq, columns=columns)
+
+def series_from_npy(
+    body: bytes,
+    start: str,
+    freq: str,
+    columns: Optional[List[str]] = None
+) -> TimeSeries:
+    values = np.load(io.BytesIO(body), allow_pickle=False)
+    return series_from_payload({"start": start, "values": values, "columns": columns}, freq=freq)
+
+def series_from_arrow(body: bytes, freq: Optional[str] = None) -> TimeSeries:
+    # Arrow IPC stream with a `timestamp` column and one float column per tank.
+    # Imported here so training and the JSON endpoints do not depend on pyarrow.
+    import pyarrow as pa
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    if "timestamp" not in table.column_names:
+        raise ValueError("Arrow payload must contain a `timestamp` column.")
+    columns = [name for name in table.column_names if name != "timestamp"]
+    epoch_ns = table["timestamp"].to_numpy().astype("datetime64[ns]").view("i8")
+    values = np.column_stack([table[name].to_numpy().astype(np.float32) for name in columns])
+    freq = freq or _freq_from_steps(epoch_ns)
+    return TimeSeries.from_times_and_values(
+        pd.DatetimeIndex(epoch_ns.view("datetime64[ns]")), values, freq=freq, columns=columns
+    )
+
+def prediction_to_payload(prediction: TimeSeries) -> Dict[str, list]:
+    return {
+        "time_index": prediction.time_index.tolist(),
+        "values": prediction.values().tolist(),
+        "columns": prediction.components.tolist()
+    }
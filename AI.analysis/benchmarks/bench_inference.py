@@ -0,0 +1,76 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from darts import TimeSeries
+
+from app.model import TSMixerModel
+
+
+def make_series(count: int, length: int, components: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-01", periods=length, freq="10T")
+    steps = np.arange(length)[:, None]
+    series_list = []
+    for _ in range(count):
+        # Standardized tank-level-like signals: slow daily cycle plus noise.
+        phase = rng.uniform(0, 2 * np.pi, components)
+        values = np.sin(2 * np.pi * steps / 144 + phase) + 0.1 * rng.standard_normal((length, components))
+        series_list.append(TimeSeries.from_times_and_values(times, values.astype(np.float32)))
+    return series_list
+
+
+def load(path: str, mode: str) -> TSMixerModel:
+    model = TSMixerModel()
+    model.load(path)
+    if mode != "eager":
+        model.compile(quantize=mode == "quantized")
+    return model
+
+
+def measure(model: TSMixerModel, series_list: list, n: int, repeats: int) -> tuple:
+    model.predict_batch(series_list, n)  # warm-up, includes tracing for compiled modes
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predictions = model.predict_batch(series_list, n)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)), np.stack([prediction.values() for prediction in predictions])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare eager, TorchScript and int8-quantized TSMixer inference on CPU.")
+    parser.add_argument("checkpoint", help="Path to a TSMixer .pt checkpoint.")
+    parser.add_argument("--components", type=int, default=1, help="Number of tank columns the model was trained on.")
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--horizon", type=int, default=12)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    models = {mode: load(args.checkpoint, mode) for mode in ("eager", "torchscript", "quantized")}
+    length = models["eager"].input_chunk_length * 2
+
+    print(f"{'batch':>5} {'mode':<12} {'median (ms)':>12} {'speedup':>8} {'MAE vs eager':>13} {'max abs err':>12}")
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        series_list = make_series(batch_size, length, args.components)
+        baseline_seconds, baseline = measure(models["eager"], series_list, args.horizon, args.repeats)
+        for mode, model in models.items():
+            if mode == "eager":
+                seconds, values = baseline_seconds, baseline
+            else:
+                seconds, values = measure(model, series_list, args.horizon, args.repeats)
+            error = np.abs(values - baseline)
+            print(
+                f"{batch_size:>5} {mode:<12} {seconds * 1000:>12.2f} {baseline_seconds / seconds:>7.1f}x "
+                f"{error.mean():>13.2e} {error.max():>12.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from darts import TimeSeries
+from sklearn.preprocessing import StandardScaler
+
+from app.utils import preprocess_data
+
+COLUMNS = ["Water Level Tank (%)", "Nutrient Tank Level (%)", "Recycle Tank Level (%)"]
+
+
+def legacy_preprocess_data(df: pd.DataFrame) -> tuple:
+    # The pandas implementation preprocess_data replaced, kept here as the baseline.
+    if not df.index.is_unique:
+        df = df[~df.index.duplicated(keep='first')]
+    df.fillna(method='ffill', inplace=True)
+    df = df.resample('10T').ffill()
+    scaler = StandardScaler()
+    scaled_data = scaler.fit_transform(df)
+    scaled_df = pd.DataFrame(scaled_data, index=df.index, columns=df.columns)
+    series_dict = {}
+    for column in scaled_df.columns:
+        series_dict[column] = TimeSeries.from_dataframe(
+            scaled_df,
+            value_cols=column,
+            fill_missing_dates=True,
+            freq='10T'
+        )
+    return series_dict, scaler
+
+
+def make_sensor_frame(days: int = 365, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    periods = days * 24 * 6
+    # Slightly jittered 10-minute readings with a few duplicates and dropouts, as seen from the sensors.
+    index = pd.date_range("2024-01-01", periods=periods, freq="10T")
+    index = index + pd.to_timedelta(rng.integers(0, 60, periods), unit="s")
+    values = rng.uniform(0, 100, size=(periods, len(COLUMNS)))
+    values[rng.random(values.shape) < 0.01] = np.nan
+    df = pd.DataFrame(values, index=index, columns=COLUMNS)
+    duplicates = df.sample(frac=0.001, random_state=seed)
+    return pd.concat([df, duplicates]).sort_index(kind="stable")
+
+
+def measure(fn, df: pd.DataFrame, repeats: int) -> tuple:
+    timings = []
+    for _ in range(repeats):
+        frame = df.copy()
+        start = time.perf_counter()
+        fn(frame)
+        timings.append(time.perf_counter() - start)
+
+    frame = df.copy()
+    tracemalloc.start()
+    fn(frame)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark preprocess_data against the legacy pandas pipeline.")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_sensor_frame(args.days)
+    print(f"{len(df)} rows x {len(COLUMNS)} columns ({args.days} days of 10-minute data)")
+    print(f"{'implementation':<12} {'best time (s)':>14} {'peak memory (MiB)':>18}")
+    for name, fn in (("legacy", legacy_preprocess_data), ("vectorized", preprocess_data)):
+        seconds, peak = measure(fn, df, args.repeats)
+        print(f"{name:<12} {seconds:>14.4f} {peak / 2**20:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from data.get_from_mongodb import DEFAULT_BATCH_SIZE, TANK_COLUMNS, iter_data_batches
+
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", "feature_cache")
+
+
+class FeatureCache:
+    """Day-partitioned Arrow IPC cache of sensor readings, synced incrementally from MongoDB."""
+
+    def __init__(self, root: str = FEATURE_CACHE_DIR, farm_id: Optional[str] = None):
+        self.farm_id = farm_id
+        self.root = os.path.join(root, farm_id or "all")
+        os.makedirs(self.root, exist_ok=True)
+
+    def _partition_path(self, day: date) -> str:
+        return os.path.join(self.root, f"date={day.isoformat()}.arrow")
+
+    def _watermark_path(self) -> str:
+        return os.path.join(self.root, "_watermark.json")
+
+    def partitions(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+        paths = []
+        for filename in sorted(os.listdir(self.root)):
+            if not (filename.startswith("date=") and filename.endswith(".arrow")):
+                continue
+            day = date.fromisoformat(filename[len("date="):-len(".arrow")])
+            if start is not None and day < start.date():
+                continue
+            if end is not None and day > end.date():
+                continue
+            paths.append(os.path.join(self.root, filename))
+        return paths
+
+    def high_water_mark(self) -> Optional[pd.Timestamp]:
+        path = self._watermark_path()
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return pd.Timestamp(json.load(f)["high_water_mark"])
+
+    def _set_high_water_mark(self, timestamp: pd.Timestamp):
+        path = self._watermark_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"high_water_mark": timestamp.isoformat()}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_partition(path: str) -> pa.Table:
+        # Memory-mapped: column buffers point into the page cache instead of being copied.
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+    def _append_partition(self, day: date, frames: List[pd.DataFrame]):
+        # Days are flushed in time order, so the mark advances only past fully written rows.
+        frame = pd.concat(frames) if len(frames) > 1 else frames[0]
+        # NaN is kept as a float value rather than a null so columns stay zero-copy readable.
+        table = pa.table({
+            "timestamp": pa.array(frame.index.values),
+            **{column: pa.array(frame[column].to_numpy(dtype=np.float64)) for column in frame.columns}
+        })
+        path = self._partition_path(day)
+        if os.path.exists(path):
+            existing = self._read_partition(path)
+            table = pa.concat_tables([existing, table.cast(existing.schema)]).combine_chunks()
+
+        tmp_path = f"{path}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        self._set_high_water_mark(frame.index.max())
+
+    def sync(self, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        high_water_mark = self.high_water_mark()
+        start = high_water_mark.to_pydatetime() if high_water_mark is not None else None
+
+        pending: Dict[date, List[pd.DataFrame]] = {}
+        synced = 0
+        try:
+            for batch in iter_data_batches(start=start, farm_id=self.farm_id, batch_size=batch_size):
+                if high_water_mark is not None:
+                    batch = batch[batch.index > high_water_mark]
+                if batch.empty:
+                    continue
+                days = batch.index.normalize()
+                for day in days.unique():
+                    pending.setdefault(day.date(), []).append(batch[days == day])
+                # Readings arrive in time order, so every day before the newest one is complete.
+                newest = days.max().date()
+                for day in [day for day in pending if day < newest]:
+                    self._append_partition(day, pending.pop(day))
+                synced += len(batch)
+
+            for day in sorted(pending):
+                self._append_partition(day, pending[day])
+        except Exception as e:
+            logging.error(f"피처 캐시 동기화 중 오류 발생: {e}")
+            raise
+
+        logging.info(f"피처 캐시 동기화 완료: {synced}건 추가 (high-water mark: {self.high_water_mark()}).")
+        return synced
+
+    def iter_tables(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[pa.Table]:
+        for path in self.partitions(start, end):
+            table = self._read_partition(path)
+            if start is not None or end is not None:
+                timestamps = table["timestamp"]
+                mask = None
+                if start is not None:
+                    mask = pc.greater_equal(timestamps, pa.scalar(np.datetime64(start, "ns")))
+                if end is not None:
+                    upper = pc.less(timestamps, pa.scalar(np.datetime64(end, "ns")))
+                    mask = upper if mask is None else pc.and_(mask, upper)
+                table = table.filter(mask)
+            yield table
+
+    def iter_arrays(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        # Unfiltered partitions are returned as zero-copy views over the mapped files.
+        for table in self.iter_tables(start, end):
+            arrays = {}
+            for name in table.column_names:
+                column = table[name]
+                if column.num_chunks == 1:
+                    arrays[name] = column.chunk(0).to_numpy(zero_copy_only=False)
+                else:
+                    arrays[name] = column.to_numpy()
+            yield arrays
+
+    def read_frame(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> pd.DataFrame:
+        tables = list(self.iter_tables(start, end))
+        if not tables:
+            return pd.DataFrame(columns=TANK_COLUMNS, index=pd.DatetimeIndex([], name="timestamp"), dtype=float)
+        table = pa.concat_tables(tables)
+        return pd.DataFrame(
+            {name: table[name].to_numpy() for name in table.column_names if name != "timestamp"},
+            index=pd.DatetimeIndex(table["timestamp"].to_numpy(), name="timestamp")
+        )
+
+
+def load_cached_data(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    farm_id: Optional[str] = None,
+    sync: bool = True
+) -> pd.DataFrame:
+    cache = FeatureCache(farm_id=farm_id)
+    if sync:
+        cache.sync()
+    return cache.read_frame(start, end)
@@ -1,33 +1,233 @@
 import logging
 import os
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from bson import CodecOptions, decode_all
+from bson.raw_bson import RawBSONDocument
 from data.mongo_utils import get_mongo_client
 from pymongo.errors import ConfigurationError, ConnectionFailure
+from pymongoarrow.api import PyMongoArrowContext, Schema
 
-def get_data_from_db() -> pd.DataFrame:
+TIMESTAMP_FORMAT = '%Y.%m.%d %H:%M'
+TANK_COLUMNS = [
+    "Water Level Tank (%)",
+    "Nutrient Tank Level (%)",
+    "Recycle Tank Level (%)"
+]
+FARM_FIELD = os.getenv("MONGO_FARM_FIELD", "farm_id")
+# 시계열 컬렉션의 metaField: {"farm_id": ..., "device_id": ...}
+META_FIELD = "device"
+DEFAULT_BATCH_SIZE = 10000
+
+def sensor_source() -> Tuple[str, str, bool]:
+    # SENSOR_COLLECTION이 설정되면 시계열 컬렉션을, 아니면 기존 합성 데이터 컬렉션을 읽습니다.
+    # 세 번째 값은 타임스탬프가 문자열로 저장되어 있는지(기존 컬렉션) 여부입니다.
+    sensor_collection = os.getenv("SENSOR_COLLECTION")
+    if sensor_collection:
+        return sensor_collection, f"{META_FIELD}.farm_id", False
+    return os.getenv("SYNTHETIC_COLLECTION"), FARM_FIELD, True
+
+def build_query(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    farm_id: Optional[str] = None,
+    farm_field: str = FARM_FIELD,
+    string_timestamps: bool = True
+) -> dict:
+    query = {}
+    if farm_id is not None:
+        query[farm_field] = farm_id
+
+    date_range, string_range = {}, {}
+    if start is not None:
+        date_range["$gte"] = start
+        string_range["$gte"] = start.strftime(TIMESTAMP_FORMAT)
+    if end is not None:
+        date_range["$lt"] = end
+        string_range["$lt"] = end.strftime(TIMESTAMP_FORMAT)
+    if date_range and not string_timestamps:
+        # 시계열 컬렉션은 날짜 타입만 저장하므로, 버킷 필터에 쓰일 수 있도록 timeField 범위만 지정합니다.
+        query["timestamp"] = date_range
+    elif date_range:
+        # 기존 컬렉션의 타임스탬프는 '%Y.%m.%d %H:%M' 문자열 또는 날짜 타입으로 저장되어 있으며,
+        # BSON 비교는 타입별로 이루어지므로 두 표현 각각에 대해 범위를 지정합니다.
+        query["$or"] = [{"timestamp": date_range}, {"timestamp": string_range}]
+    return query
+
+def _parse_timestamps(raw: np.ndarray) -> pd.DatetimeIndex:
+    is_string = np.fromiter((isinstance(value, str) for value in raw), dtype=bool, count=len(raw))
+    parsed = np.empty(len(raw), dtype="datetime64[ns]")
+    if is_string.any():
+        parsed[is_string] = pd.to_datetime(raw[is_string], format=TIMESTAMP_FORMAT).values
+    if not is_string.all():
+        parsed[~is_string] = pd.to_datetime(raw[~is_string]).values
+    return pd.DatetimeIndex(parsed, name="timestamp")
+
+def batch_schema(columns: List[str], string_timestamps: bool) -> Schema:
+    # 기존 컬렉션은 문자열, 시계열 컬렉션은 날짜 타입 타임스탬프를 저장합니다.
+    timestamp_type = pa.string() if string_timestamps else pa.timestamp("ms")
+    return Schema({"timestamp": timestamp_type, **{column: pa.float64() for column in columns}})
+
+def _decode_raw_batch(raw_batch: bytes, schema: Schema, codec_options=None) -> pa.Table:
+    context = PyMongoArrowContext(schema, codec_options=codec_options)
+    context.process_bson_stream(raw_batch)
+    return context.finish()
+
+def _raw_timestamps(raw_batch: bytes, codec_options=None) -> np.ndarray:
+    # 문서를 원시 BSON으로 나눈 뒤 타임스탬프 필드만 읽으므로 값 열은 다시 디코딩하지 않습니다.
+    options = (codec_options or CodecOptions()).with_options(document_class=RawBSONDocument)
+    documents = decode_all(raw_batch, options)
+    timestamps = np.empty(len(documents), dtype=object)
+    timestamps[:] = [document.get("timestamp") for document in documents]
+    return timestamps
+
+def frame_from_raw_batch(raw_batch: bytes, schema: Schema, columns: List[str], codec_options=None) -> pd.DataFrame:
+    # pymongoarrow이 BSON 배치를 Arrow 열 빌더로 바로 디코딩하므로 문서별 dict가 만들어지지 않습니다.
+    try:
+        table = _decode_raw_batch(raw_batch, schema, codec_options)
+        timestamps = table["timestamp"]
+        if pa.types.is_string(timestamps.type):
+            index = _parse_timestamps(timestamps.to_numpy(zero_copy_only=False))
+        else:
+            index = pd.DatetimeIndex(timestamps.to_numpy().astype("datetime64[ns]"), name="timestamp")
+    except TypeError:
+        # 기존 컬렉션에 날짜 타입 타임스탬프가 섞인 배치는 pymongoarrow이 거부하므로,
+        # 값 열만 Arrow로 디코딩하고 타임스탬프는 문서별로 읽어 두 표현을 모두 변환합니다.
+        table = _decode_raw_batch(
+            raw_batch, Schema({column: pa.float64() for column in columns}), codec_options
+        )
+        index = _parse_timestamps(_raw_timestamps(raw_batch, codec_options))
+    # 누락된 값(null)은 NaN으로 변환됩니다.
+    values = np.column_stack([table[column].to_numpy(zero_copy_only=False) for column in columns])
+    return pd.DataFrame(values, index=index, columns=columns)
+
+def iter_data_batches(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    farm_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
     MONGO_DB = os.getenv("MONGO_DB")
-    SYNTHETIC_COLLECTION = os.getenv("SYNTHETIC_COLLECTION")
+    collection_name, farm_field, string_timestamps = sensor_source()
+    columns = columns or TANK_COLUMNS
+    schema = batch_schema(columns, string_timestamps)
 
-    client = None
     try:
         client = get_mongo_client()
-        db = client[MONGO_DB]
-        collection = db[SYNTHETIC_COLLECTION]
-
-        fields = {
-            "_id": 0,
-            "timestamp": 1,
-            "Water Level Tank (%)": 1,
-            "Nutrient Tank Level (%)": 1,
-            "Recycle Tank Level (%)": 1
-        }
-        data = list(collection.find({}, fields))
-
-        df = pd.DataFrame(data)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y.%m.%d %H:%M')
-        df.set_index('timestamp', inplace=True)
-        logging.info("MongoDB에서 데이터를 성공적으로 가져왔습니다.")
+        collection = client[MONGO_DB][collection_name]
+
+        fields = {"_id": 0, "timestamp": 1, **{column: 1 for column in columns}}
+        # 커서가 돌려주는 원시 BSON 배치를 그대로 받아 배치 단위로 열 배열을 만듭니다.
+        raw_batches = collection.find_raw_batches(
+            build_query(start, end, farm_id, farm_field, string_timestamps),
+            fields,
+            sort=[("timestamp", 1)],
+            batch_size=batch_size,
+            allow_disk_use=True
+        )
+
+        total = 0
+        for raw_batch in raw_batches:
+            batch = frame_from_raw_batch(raw_batch, schema, columns, collection.codec_options)
+            if batch.empty:
+                continue
+            total += len(batch)
+            yield batch
+        logging.info(f"MongoDB에서 {total}개의 데이터를 스트리밍으로 가져왔습니다.")
+
+    except ConnectionFailure:
+        logging.error("MongoDB 서버에 연결할 수 없습니다.")
+        raise
+    except ConfigurationError as e:
+        logging.error(f"MongoDB 설정 오류: {e}")
+        raise
+    except Exception as e:
+        logging.error(f"데이터 가져오기 중 오류 발생: {e}")
+        raise
+
+def get_data_from_db(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    farm_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> pd.DataFrame:
+    indexes, blocks = [], []
+    for batch in iter_data_batches(start, end, farm_id, batch_size):
+        indexes.append(batch.index.values)
+        blocks.append(batch.values)
+
+    if not blocks:
+        logging.warning("조회된 데이터가 없습니다.")
+        return pd.DataFrame(columns=TANK_COLUMNS, index=pd.DatetimeIndex([], name="timestamp"), dtype=float)
+
+    df = pd.DataFrame(
+        np.concatenate(blocks),
+        index=pd.DatetimeIndex(np.concatenate(indexes), name="timestamp"),
+        columns=TANK_COLUMNS
+    )
+    if not df.index.is_monotonic_increasing:
+        df.sort_index(inplace=True, kind="stable")
+    logging.info("MongoDB에서 데이터를 성공적으로 가져왔습니다.")
+
+    return df
+
+def get_downsampled_data_from_db(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    farm_id: Optional[str] = None,
+    bin_minutes: int = 10,
+    how: str = "last"
+) -> pd.DataFrame:
+    if how not in ("last", "mean"):
+        raise ValueError(f"Unsupported aggregation: {how}")
+
+    MONGO_DB = os.getenv("MONGO_DB")
+    collection_name, farm_field, string_timestamps = sensor_source()
+    accumulator = "$last" if how == "last" else "$avg"
+
+    pipeline = [{"$match": build_query(start, end, farm_id, farm_field, string_timestamps)}]
+    if string_timestamps:
+        # 기존 컬렉션의 문자열 타임스탬프는 서버에서 날짜로 변환합니다.
+        pipeline.append({"$set": {"timestamp": {"$cond": [
+            {"$eq": [{"$type": "$timestamp"}, "string"]},
+            {"$dateFromString": {"dateString": "$timestamp", "format": TIMESTAMP_FORMAT}},
+            "$timestamp"
+        ]}}})
+    pipeline += [
+        {"$sort": {"timestamp": 1}},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$timestamp", "unit": "minute", "binSize": bin_minutes}},
+            **{f"v{j}": {accumulator: f"${column}"} for j, column in enumerate(TANK_COLUMNS)}
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+
+    try:
+        client = get_mongo_client()
+        collection = client[MONGO_DB][collection_name]
+
+        timestamps, rows = [], []
+        for document in collection.aggregate(pipeline, allowDiskUse=True):
+            timestamps.append(document["_id"])
+            rows.append([
+                np.nan if document.get(f"v{j}") is None else document[f"v{j}"]
+                for j in range(len(TANK_COLUMNS))
+            ])
+
+        if not rows:
+            logging.warning("조회된 데이터가 없습니다.")
+            return pd.DataFrame(columns=TANK_COLUMNS, index=pd.DatetimeIndex([], name="timestamp"), dtype=float)
 
+        df = pd.DataFrame(
+            np.asarray(rows, dtype=np.float64),
+            index=pd.DatetimeIndex(timestamps, name="timestamp"),
+            columns=TANK_COLUMNS
+        )
+        logging.info(f"MongoDB에서 {bin_minutes}분 단위로 집계된 데이터 {len(df)}건을 가져왔습니다.")
         return df
 
     except ConnectionFailure:
@@ -39,7 +239,3 @@ def get_data_from_db() -> pd.DataFrame:
     except Exception as e:
         logging.error(f"데이터 가져오기 중 오류 발생: {e}")
         raise
-    finally:
-        if client:
-            client.close()
-            logging.info("MongoDB 클라이언트를 닫았습니다.")
@@ -1,12 +1,20 @@
 import os
 import logging
+import threading
+from typing import Optional
 from pymongo import MongoClient
 from pymongo.errors import ConfigurationError, ConnectionFailure
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_mongo_client():
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+_health_thread: Optional[threading.Thread] = None
+_health_stop = threading.Event()
+_healthy = False
+
+def _build_client() -> MongoClient:
     MONGO_USER = os.getenv("MONGO_USER")
     MONGO_PASSWORD = os.getenv("MONGO_PASSWORD")
     MONGO_HOST = os.getenv("MONGO_HOST", "39.115.5.187")
@@ -15,20 +23,77 @@ def get_mongo_client():
 
     uri = f"mongodb://{MONGO_USER}:{MONGO_PASSWORD}@{MONGO_HOST}:{MONGO_PORT}/{MONGO_DB}?authSource=admin"
 
-    try:
-        client = MongoClient(
-            uri,
-            serverSelectionTimeoutMS=5000, 
-        )
-        client.admin.command("ping")
-        logging.info("MongoDB에 성공적으로 연결되었습니다.")
-        return client
-    except ConnectionFailure:
-        logging.error("MongoDB 서버에 연결할 수 없습니다.")
-        raise
-    except ConfigurationError as e:
-        logging.error(f"MongoDB 설정 오류: {e}")
-        raise
-    except Exception as e:
-        logging.error(f"MongoDB 연결 중 오류 발생: {e}")
-        raise
+    return MongoClient(
+        uri,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+        minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    )
+
+def _health_check_loop(client: MongoClient, interval: float):
+    global _healthy
+    while not _health_stop.wait(interval):
+        try:
+            client.admin.command("ping")
+            if not _healthy:
+                logging.info("MongoDB 연결이 복구되었습니다.")
+            _healthy = True
+        except Exception as e:
+            if _healthy:
+                logging.error(f"MongoDB 상태 확인 실패: {e}")
+            _healthy = False
+
+# 프로세스 전역에서 공유하는 MongoClient를 반환합니다. 호출자는 클라이언트를 닫지 않습니다.
+def get_mongo_client() -> MongoClient:
+    global _client, _health_thread, _healthy
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is not None:
+            return _client
+        try:
+            client = _build_client()
+            # 최초 생성 시에만 연결을 확인하고, 이후에는 백그라운드에서 주기적으로 확인합니다.
+            try:
+                client.admin.command("ping")
+            except Exception:
+                # 재시도할 때마다 모니터 스레드와 소켓이 남지 않도록 실패한 클라이언트를 닫습니다.
+                client.close()
+                raise
+            _healthy = True
+            logging.info("MongoDB에 성공적으로 연결되었습니다.")
+        except ConnectionFailure:
+            logging.error("MongoDB 서버에 연결할 수 없습니다.")
+            raise
+        except ConfigurationError as e:
+            logging.error(f"MongoDB 설정 오류: {e}")
+            raise
+        except Exception as e:
+            logging.error(f"MongoDB 연결 중 오류 발생: {e}")
+            raise
+
+        interval = float(os.getenv("MONGO_HEALTHCHECK_INTERVAL", "30"))
+        if interval > 0:
+            _health_stop.clear()
+            _health_thread = threading.Thread(
+                target=_health_check_loop, args=(client, interval), daemon=True
+            )
+            _health_thread.start()
+        _client = client
+        return _client
+
+def is_mongo_healthy() -> bool:
+    return _client is not None and _healthy
+
+def close_mongo_client():
+    global _client, _health_thread, _healthy
+    with _client_lock:
+        _health_stop.set()
+        if _client is not None:
+            _client.close()
+            logging.info("MongoDB 클라이언트를 닫았습니다.")
+        _client = None
+        _health_thread = None
+        _healthy = False
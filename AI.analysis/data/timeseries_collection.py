@@ -0,0 +1,113 @@
+import logging
+import os
+from typing import List, Optional
+
+import pandas as pd
+from pymongo.collection import Collection
+from pymongo.database import Database
+from data.get_from_mongodb import META_FIELD, TANK_COLUMNS, _parse_timestamps
+from data.mongo_utils import get_mongo_client
+
+TIME_FIELD = "timestamp"
+DEFAULT_FARM_ID = os.getenv("DEFAULT_FARM_ID", "default")
+DEFAULT_DEVICE_ID = os.getenv("DEFAULT_DEVICE_ID", "default")
+
+
+def ensure_sensor_collection(db: Database, name: str, granularity: str = "minutes") -> Collection:
+    if name not in db.list_collection_names(filter={"name": name}):
+        db.create_collection(
+            name,
+            timeseries={"timeField": TIME_FIELD, "metaField": META_FIELD, "granularity": granularity}
+        )
+        logging.info(f"시계열 컬렉션 '{name}'을 생성했습니다.")
+
+    collection = db[name]
+    # 농장/장치별 구간 조회가 인덱스 스캔이 되도록 (device, timestamp) 복합 인덱스를 만듭니다.
+    collection.create_index(
+        [(f"{META_FIELD}.farm_id", 1), (f"{META_FIELD}.device_id", 1), (TIME_FIELD, 1)],
+        name="device_timestamp"
+    )
+    collection.create_index([(TIME_FIELD, 1)], name="timestamp")
+    return collection
+
+def get_sensor_collection() -> Collection:
+    client = get_mongo_client()
+    db = client[os.getenv("MONGO_DB")]
+    return ensure_sensor_collection(db, os.getenv("SENSOR_COLLECTION"))
+
+def _meta_ids(chunk: pd.DataFrame, column: str, default: str) -> List[str]:
+    if column in chunk.columns:
+        return chunk.pop(column).fillna(default).astype(str).tolist()
+    return [default] * len(chunk)
+
+def to_sensor_records(
+    chunk: pd.DataFrame,
+    farm_id: Optional[str] = None,
+    device_id: Optional[str] = None
+) -> List[dict]:
+    if not pd.api.types.is_datetime64_any_dtype(chunk[TIME_FIELD]):
+        chunk[TIME_FIELD] = _parse_timestamps(chunk[TIME_FIELD].to_numpy(dtype=object))
+    # 시계열 컬렉션은 timeField가 필수이고 NaT는 BSON으로 인코딩할 수 없으므로 해당 행을 제외합니다.
+    valid = chunk[TIME_FIELD].notna()
+    if not valid.all():
+        logging.warning(f"타임스탬프가 없는 {int((~valid).sum())}행을 건너뜁니다.")
+        chunk = chunk[valid].copy()
+
+    farm_ids = _meta_ids(chunk, "farm_id", farm_id or DEFAULT_FARM_ID)
+    device_ids = _meta_ids(chunk, "device_id", device_id or DEFAULT_DEVICE_ID)
+
+    records = chunk.to_dict("records")
+    for record, farm, device in zip(records, farm_ids, device_ids):
+        record[META_FIELD] = {"farm_id": farm, "device_id": device}
+    return records
+
+def migrate_to_timeseries(
+    source_collection: Optional[str] = None,
+    target_collection: Optional[str] = None,
+    farm_id: Optional[str] = None,
+    device_id: Optional[str] = None,
+    batch_size: int = 10000
+) -> int:
+    source_collection = source_collection or os.getenv("SYNTHETIC_COLLECTION")
+    target_collection = target_collection or os.getenv("SENSOR_COLLECTION")
+    if not target_collection:
+        raise ValueError("SENSOR_COLLECTION 환경 변수 또는 target_collection이 필요합니다.")
+
+    try:
+        client = get_mongo_client()
+        db = client[os.getenv("MONGO_DB")]
+        source = db[source_collection]
+        target = ensure_sensor_collection(db, target_collection)
+
+        fields = {"_id": 0, TIME_FIELD: 1, "farm_id": 1, "device_id": 1, **{column: 1 for column in TANK_COLUMNS}}
+        cursor = source.find({}, fields).batch_size(batch_size)
+
+        migrated = 0
+        batch = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) == batch_size:
+                migrated += _insert_batch(target, batch, farm_id, device_id)
+                batch = []
+        if batch:
+            migrated += _insert_batch(target, batch, farm_id, device_id)
+
+        logging.info(f"'{source_collection}'에서 시계열 컬렉션 '{target_collection}'으로 {migrated}건을 이전했습니다.")
+        return migrated
+
+    except Exception as e:
+        logging.error(f"시계열 컬렉션 이전 중 오류 발생: {e}")
+        raise
+
+def _insert_batch(target: Collection, documents: List[dict], farm_id: Optional[str], device_id: Optional[str]) -> int:
+    chunk = pd.DataFrame(documents)
+    chunk = chunk[chunk[TIME_FIELD].notna()].copy()
+    if chunk.empty:
+        return 0
+    records = to_sensor_records(chunk, farm_id, device_id)
+    target.insert_many(records, ordered=False)
+    return len(records)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    migrate_to_timeseries()
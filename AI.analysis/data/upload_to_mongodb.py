@@ -1,8 +1,20 @@
+import json
 import logging
 import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+from data.get_from_mongodb import TIMESTAMP_FORMAT
 from data.mongo_utils import get_mongo_client
+from data.timeseries_collection import TIME_FIELD, ensure_sensor_collection, to_sensor_records
+
+DEFAULT_CHUNK_SIZE = 50000
+DUPLICATE_KEY_ERROR = 11000
 
 
 def load_data_from_csv(file_path: str = "Synthetic_data.csv") -> pd.DataFrame:
@@ -17,26 +29,166 @@ def load_data_from_csv(file_path: str = "Synthetic_data.csv") -> pd.DataFrame:
         logging.error(f"CSV 파일 로드 중 오류 발생: {e}")
         raise
 
-def upload_csv_to_mongodb(file_path: str = "Synthetic_data.csv") -> None:
-    client = None
+def iter_csv_chunks(file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    try:
+        # 헤더는 유지하고 이미 업로드된 데이터 행만 건너뜁니다.
+        skiprows = range(1, skip_rows + 1) if skip_rows else None
+        yield from pd.read_csv(file_path, chunksize=chunk_size, skiprows=skiprows)
+    except FileNotFoundError:
+        logging.error(f"CSV 파일 '{file_path}'을 찾을 수 없습니다.")
+        raise
+
+def _to_records(chunk: pd.DataFrame) -> list:
+    if "timestamp" in chunk.columns:
+        # 기존 컬렉션은 문자열 타임스탬프만 저장합니다. 청크 단위로 한 번에 검증해 형식을 맞추고,
+        # 타임스탬프가 없거나 잘못된 행은 건너뜁니다 (NaT는 BSON으로 인코딩할 수 없습니다).
+        timestamps = pd.to_datetime(chunk["timestamp"], format=TIMESTAMP_FORMAT, errors="coerce")
+        valid = timestamps.notna()
+        if not valid.all():
+            logging.warning(f"타임스탬프가 없거나 잘못된 {int((~valid).sum())}행을 건너뜁니다.")
+            chunk = chunk[valid].copy()
+        chunk["timestamp"] = timestamps[valid].dt.strftime(TIMESTAMP_FORMAT)
+    return chunk.to_dict("records")
+
+def _with_row_ids(chunk: pd.DataFrame, offset: int) -> pd.DataFrame:
+    # CSV 행 번호와 원본 타임스탬프로 만든 결정적 _id: 재개 시 다시 보낸 행은 같은 _id를 가집니다.
+    rows = pd.Series(offset + np.arange(len(chunk)), index=chunk.index).astype(str)
+    if "timestamp" in chunk.columns:
+        rows += "|" + chunk["timestamp"].astype(str)
+    return chunk.assign(_id=rows)
+
+def _file_identity(file_path: str) -> dict:
+    stat = os.stat(file_path)
+    return {"file_size": stat.st_size, "file_mtime_ns": stat.st_mtime_ns}
+
+def _read_checkpoint(checkpoint_path: str, file_path: str) -> int:
+    if not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if {key: checkpoint.get(key) for key in ("file_size", "file_mtime_ns")} != _file_identity(file_path):
+        logging.info("체크포인트가 현재 CSV 파일과 맞지 않아 처음부터 업로드합니다.")
+        return 0
+    return int(checkpoint.get("rows_done", 0))
+
+def _write_checkpoint(checkpoint_path: str, file_path: str, rows_done: int):
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"rows_done": rows_done, **_file_identity(file_path)}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+def _without_existing(collection: Collection, records: List[dict]) -> List[dict]:
+    # 시계열 컬렉션은 _id가 고유하지 않아 중복 키 오류가 나지 않으므로, 재개한 업로드에서는
+    # 청크의 시간 범위에 이미 있는 _id를 조회해 제외합니다.
+    timestamps = [record[TIME_FIELD] for record in records]
+    existing = {
+        document["_id"]
+        for document in collection.find(
+            {
+                TIME_FIELD: {"$gte": min(timestamps), "$lte": max(timestamps)},
+                "_id": {"$in": [record["_id"] for record in records]},
+            },
+            {"_id": 1}
+        )
+    }
+    return [record for record in records if record["_id"] not in existing]
+
+def _insert_records(collection: Collection, records: List[dict], skip_existing: bool = False) -> int:
+    if skip_existing:
+        records = _without_existing(collection, records)
+        if not records:
+            return 0
     try:
-        df = load_data_from_csv(file_path)
-        data_dict = df.to_dict("records")
+        return len(collection.insert_many(records, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        # 재개 시 이전 실행에서 이미 들어간 행은 중복 키 오류가 나며, 나머지 행은 그대로 삽입됩니다.
+        if e.details.get("writeConcernErrors") or any(
+            error["code"] != DUPLICATE_KEY_ERROR for error in e.details["writeErrors"]
+        ):
+            raise
+        return e.details["nInserted"]
 
+def upload_csv_to_mongodb(
+    file_path: str = "Synthetic_data.csv",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 4,
+    checkpoint_path: Optional[str] = None,
+    resume: bool = True,
+    farm_id: Optional[str] = None,
+    device_id: Optional[str] = None
+) -> int:
+    checkpoint_path = checkpoint_path or f"{file_path}.upload.json"
+    try:
         client = get_mongo_client()
         db = client[os.getenv("MONGO_DB")]
-        collection = db[os.getenv("SYNTHETIC_COLLECTION")]
+        sensor_collection = os.getenv("SENSOR_COLLECTION")
+        if sensor_collection:
+            collection = ensure_sensor_collection(db, sensor_collection)
+        else:
+            collection = db[os.getenv("SYNTHETIC_COLLECTION")]
+
+        rows_done = _read_checkpoint(checkpoint_path, file_path) if resume else 0
+        if rows_done:
+            logging.info(f"체크포인트에서 재개합니다: {rows_done}행 이후부터 업로드합니다.")
+
+        # 청크는 순서와 무관하게 완료되므로, 연속으로 완료된 구간까지만 체크포인트에 기록합니다.
+        completed = {}
+        next_offset = rows_done
+        uploaded = 0
+        started = time.perf_counter()
+        in_flight = {}
+
+        def drain(return_when):
+            nonlocal next_offset, uploaded
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                offset, rows = in_flight.pop(future)
+                uploaded += future.result()
+                completed[offset] = rows
+            while next_offset in completed:
+                next_offset += completed.pop(next_offset)
+            _write_checkpoint(checkpoint_path, file_path, next_offset)
+            elapsed = time.perf_counter() - started
+            logging.info(f"{next_offset}행 업로드 완료 ({uploaded / elapsed:.0f} rows/sec).")
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            offset = rows_done
+            for chunk in iter_csv_chunks(file_path, chunk_size, skip_rows=rows_done):
+                # 체크포인트는 CSV 행 기준이므로, 건너뛴 행이 있어도 청크의 행 수만큼 진행합니다.
+                rows = len(chunk)
+                chunk = _with_row_ids(chunk, offset)
+                if sensor_collection:
+                    records = to_sensor_records(chunk, farm_id, device_id)
+                else:
+                    records = _to_records(chunk)
+                if records:
+                    # 이전 실행에서 순서와 무관하게 완료됐거나 일부만 삽입된 청크는 체크포인트 이후에 다시 보내집니다.
+                    future = executor.submit(
+                        _insert_records, collection, records, skip_existing=bool(sensor_collection and rows_done)
+                    )
+                else:
+                    future = Future()
+                    future.set_result(0)
+                in_flight[future] = (offset, rows)
+                offset += rows
+                if len(in_flight) >= workers * 2:
+                    drain(FIRST_COMPLETED)
+            if in_flight:
+                drain(ALL_COMPLETED)
+        # 완료된 업로드의 체크포인트를 남기면 같은 경로의 새 파일이 전부 건너뛰어집니다.
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
 
-        if data_dict:
-            collection.insert_many(data_dict)
-            logging.info("CSV 데이터를 MongoDB에 성공적으로 업로드했습니다.")
+        elapsed = time.perf_counter() - started
+        if uploaded:
+            logging.info(
+                f"CSV 데이터를 MongoDB에 성공적으로 업로드했습니다: {uploaded}행, "
+                f"{elapsed:.1f}초, {uploaded / elapsed:.0f} rows/sec."
+            )
         else:
-            logging.warning("CSV 파일이 비어있어 업로드할 데이터가 없습니다.")
+            logging.warning("업로드할 데이터가 없습니다.")
+        return uploaded
 
     except Exception as e:
         logging.error(f"CSV 데이터를 MongoDB에 업로드하는 중 오류 발생: {e}")
         raise
-    finally:
-        if client:
-            client.close()
-            logging.info("MongoDB 클라이언트를 닫았습니다.")
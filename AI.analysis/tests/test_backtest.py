@@ -0,0 +1,62 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.backtest import _out_of_sample_start, forecast_errors, run_backtest
+
+
+def test_forecast_errors_per_column_and_horizon():
+    # (windows, steps, columns)
+    actuals = np.array([[[10.0, 0.0], [20.0, 5.0]], [[10.0, 0.0], [20.0, 5.0]]])
+    forecasts = actuals + np.array([[[1.0, 2.0], [-2.0, 1.0]], [[3.0, 2.0], [2.0, -1.0]]])
+
+    errors = forecast_errors(forecasts, actuals, ["water", "nutrient"], horizons=[1, 2])
+
+    assert errors["water"]["1"] == pytest.approx({"mae": 2.0, "rmse": np.sqrt(5.0), "mape": 20.0})
+    assert errors["water"]["2"] == pytest.approx({"mae": 2.0, "rmse": 2.0, "mape": 10.0})
+    assert errors["nutrient"]["2"] == pytest.approx({"mae": 1.0, "rmse": 1.0, "mape": 20.0})
+
+
+def test_forecast_errors_mape_undefined_at_zero_actuals():
+    actuals = np.zeros((3, 1, 1))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        errors = forecast_errors(actuals + 1.0, actuals, ["water"], horizons=[1])
+
+    assert errors["water"]["1"]["mape"] is None
+    assert errors["water"]["1"]["mae"] == 1.0
+
+
+def test_start_is_clipped_to_first_step_after_training():
+    record = {"trained_until": "2024-06-01T12:03:00"}
+
+    assert _out_of_sample_start("TSMixer_a", record, None, in_sample=False) == "2024-06-01T12:10:00"
+    assert _out_of_sample_start("TSMixer_a", record, "2024-01-01", in_sample=False) == "2024-06-01T12:10:00"
+    assert _out_of_sample_start("TSMixer_a", record, "2024-07-01", in_sample=False) == "2024-07-01"
+    assert _out_of_sample_start("TSMixer_a", record, "2024-01-01", in_sample=True) == "2024-01-01"
+
+
+def test_start_unchanged_without_trained_until(caplog):
+    assert _out_of_sample_start("TSMixer_a", {"trained_until": None}, "2024-01-01", in_sample=False) == "2024-01-01"
+    assert "trained_until" in caplog.text
+
+
+def test_failed_model_is_recorded_and_retried(tmp_path):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    # No scaler sidecar, as for an uploaded model.
+    (models_dir / "TSMixer_a.pt").write_bytes(b"not a checkpoint")
+    times = pd.date_range("2024-01-01", periods=48, freq="10T")
+    history = pd.DataFrame({"water": np.linspace(40.0, 60.0, 48)}, index=times)
+
+    report = run_backtest(
+        history, horizons=[1], max_workers=1, models_dir=str(models_dir), report_path=str(tmp_path / "report.json")
+    )
+
+    result = report["results"]["TSMixer_a"]
+    assert "TSMixer_a" in result["error"] and result["windows"] == 0
+    # Without a cache key, the next run evaluates it again instead of reusing the error.
+    assert "key" not in result
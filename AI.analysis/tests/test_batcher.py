@@ -0,0 +1,67 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from darts import TimeSeries
+
+from app.batcher import PredictionBatcher
+
+
+class ShortSeriesRejectingManager:
+    # Stands in for ModelManager: like TSMixer, a series shorter than the input window fails the whole batch.
+    input_chunk_length = 4
+
+    def __init__(self):
+        self.batch_calls = 0
+
+    def predict(self, model_name, series, n):
+        if len(series) < self.input_chunk_length:
+            raise ValueError(f"Series has {len(series)} points.")
+        return series[-n:]
+
+    def predict_batch(self, model_name, series_list, n):
+        self.batch_calls += 1
+        return [self.predict(model_name, series, n) for series in series_list]
+
+
+def make_series(length: int) -> TimeSeries:
+    times = pd.date_range("2024-01-01", periods=length, freq="10T")
+    return TimeSeries.from_times_and_values(times, np.arange(length, dtype=np.float32))
+
+
+async def _submit_all(batcher: PredictionBatcher, series_list: list) -> list:
+    return await asyncio.gather(
+        *(batcher.submit("TSMixer", series) for series in series_list), return_exceptions=True
+    )
+
+
+def test_coalesced_requests_share_one_batch():
+    manager = ShortSeriesRejectingManager()
+    batcher = PredictionBatcher(manager, max_batch_size=8, max_wait_ms=20)
+
+    results = asyncio.run(_submit_all(batcher, [make_series(6), make_series(8)]))
+
+    assert manager.batch_calls == 1
+    assert [result.values()[0, 0] for result in results] == [5, 7]
+    assert batcher.stats()["max_observed_batch_size"] == 2
+
+
+def test_failing_series_does_not_fail_its_batch():
+    manager = ShortSeriesRejectingManager()
+    batcher = PredictionBatcher(manager, max_batch_size=8, max_wait_ms=20)
+
+    valid, short = asyncio.run(_submit_all(batcher, [make_series(6), make_series(2)]))
+
+    assert valid.values()[0, 0] == 5
+    assert isinstance(short, ValueError)
+    assert not batcher._tasks
+
+
+def test_single_failing_request_is_not_retried():
+    manager = ShortSeriesRejectingManager()
+    batcher = PredictionBatcher(manager, max_batch_size=8, max_wait_ms=1)
+
+    with pytest.raises(ValueError):
+        asyncio.run(batcher.submit("TSMixer", make_series(2)))
+    assert manager.batch_calls == 1
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import torch
+
+from app.model import TSMixerModel
+from benchmarks.bench_inference import make_series
+
+TRAINER_KWARGS = {"enable_progress_bar": False, "logger": False, "enable_model_summary": False}
+
+
+@pytest.fixture(scope="module")
+def trained():
+    model = TSMixerModel(
+        input_chunk_length=12, output_chunk_length=6, n_epochs=1,
+        model_kwargs={"pl_trainer_kwargs": TRAINER_KWARGS}
+    )
+    model.train(make_series(2, 200, 2))
+    return model
+
+
+@pytest.mark.parametrize("n", [4, 6, 9, 15])
+@pytest.mark.parametrize("quantize, atol", [(False, 1e-5), (True, 0.1)])
+def test_compiled_matches_eager(trained, quantize, atol, n):
+    series_list = make_series(3, 48, 2, seed=1)
+    expected = trained.predict_batch(series_list, n)
+
+    trained.compile(quantize=quantize)
+    try:
+        predictions = trained.predict_batch(series_list, n)
+        # A failed trace falls back to eager and drops the compiled predictor.
+        assert trained.compiled is not None
+    finally:
+        trained.compiled = None
+
+    for prediction, reference in zip(predictions, expected):
+        assert prediction.time_index.equals(reference.time_index)
+        np.testing.assert_allclose(prediction.values(), reference.values(), atol=atol)
+
+
+def test_wrong_width_is_rejected_and_keeps_compiled(trained):
+    trained.compile()
+    try:
+        with pytest.raises(ValueError, match="trained on 2"):
+            trained.predict_batch(make_series(1, 48, 3), 6)
+        assert trained.compiled is not None
+    finally:
+        trained.compiled = None
+
+
+def test_runtime_error_falls_back_for_one_batch(trained, monkeypatch):
+    series_list = make_series(1, 48, 2)
+    expected = trained.predict_batch(series_list, 6)[0].values()
+    trained.compile()
+    compiled = trained.compiled
+
+    def fail(windows, n):
+        raise RuntimeError("out of memory")
+
+    monkeypatch.setattr(compiled, "forecast", fail)
+    try:
+        np.testing.assert_allclose(trained.predict_batch(series_list, 6)[0].values(), expected)
+        assert trained.compiled is compiled
+    finally:
+        trained.compiled = None
+
+
+def test_trace_failure_disables_compiled(trained, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("unsupported operator")
+
+    trained.compile()
+    monkeypatch.setattr(torch.jit, "trace", fail)
+    try:
+        trained.predict_batch(make_series(1, 48, 2), 6)
+        assert trained.compiled is None
+    finally:
+        trained.compiled = None
@@ -0,0 +1,35 @@
+import importlib
+import sys
+
+import numpy as np
+import orjson
+import pandas as pd
+import pyarrow as pa
+from darts import TimeSeries
+
+from app import encoding
+
+
+def make_prediction() -> TimeSeries:
+    times = pd.date_range("2024-01-01", periods=2, freq="10T")
+    return TimeSeries.from_times_and_values(times, np.array([[50.0], [49.0]], dtype=np.float32), columns=["water"])
+
+
+def test_json_responses_do_not_need_pyarrow(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    try:
+        module = importlib.reload(encoding)
+        response = module.prediction_response(make_prediction(), "application/json")
+    finally:
+        monkeypatch.undo()
+        importlib.reload(encoding)
+
+    assert orjson.loads(response.body)["series_prediction"]["series_prediction"]["values"] == [[50.0], [49.0]]
+
+
+def test_arrow_response_round_trip():
+    response = encoding.prediction_response(make_prediction(), encoding.ARROW_MEDIA_TYPE)
+
+    table = pa.ipc.open_stream(pa.py_buffer(response.body)).read_all()
+    assert table["water"].to_pylist() == [50.0, 49.0]
+    assert table.schema.metadata[b"start"] == b"2024-01-01T00:00:00"
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from darts import TimeSeries
+
+from app.forecast_cache import ForecastCache
+
+
+def make_series(values, columns=None, dtype=np.float32, start="2024-01-01") -> TimeSeries:
+    times = pd.date_range(start, periods=len(values), freq="10T")
+    return TimeSeries.from_times_and_values(times, np.asarray(values, dtype=dtype), columns=columns)
+
+
+def test_key_depends_on_model_version_window_and_horizon():
+    series = make_series([1.0, 2.0, 3.0])
+    key = ForecastCache.make_key("TSMixer", 1, series, 12)
+
+    assert key == ForecastCache.make_key("TSMixer", 1, make_series([1.0, 2.0, 3.0]), 12)
+    assert key != ForecastCache.make_key("TSMixer", 2, series, 12)
+    assert key != ForecastCache.make_key("TSMixer", 1, series, 6)
+    assert key != ForecastCache.make_key("TSMixer", 1, make_series([1.0, 2.0, 4.0]), 12)
+    assert key != ForecastCache.make_key("TSMixer", 1, make_series([1.0, 2.0, 3.0], start="2024-01-02"), 12)
+
+
+def test_identical_values_from_different_tanks_do_not_collide():
+    water = make_series([50.0, 51.0], columns=["Water Level Tank (%)"])
+    nutrient = make_series([50.0, 51.0], columns=["Nutrient Tank Level (%)"])
+
+    assert ForecastCache.make_key("TSMixer", 1, water, 1) != ForecastCache.make_key("TSMixer", 1, nutrient, 1)
+
+
+def test_entries_expire_and_are_evicted_lru():
+    cache = ForecastCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+    expired = ForecastCache(ttl_seconds=-1)
+    expired.put("a", 1)
+    assert expired.get("a") is None
+    assert expired.stats()["expirations"] == 1
+
+
+def test_invalidate_model_drops_only_its_entries():
+    cache = ForecastCache()
+    series = make_series([1.0])
+    cache.put(ForecastCache.make_key("TSMixer_a", 1, series, 1), "a")
+    cache.put(ForecastCache.make_key("TSMixer_b", 1, series, 1), "b")
+
+    cache.invalidate_model("TSMixer_a")
+
+    assert cache.get(ForecastCache.make_key("TSMixer_a", 1, series, 1)) is None
+    assert cache.get(ForecastCache.make_key("TSMixer_b", 1, series, 1)) == "b"
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import bson
+import numpy as np
+import pandas as pd
+
+from data.get_from_mongodb import batch_schema, frame_from_raw_batch
+
+COLUMNS = ["Water Level Tank (%)", "Nutrient Tank Level (%)"]
+
+
+def raw_batch(documents) -> bytes:
+    return b"".join(bson.encode(document) for document in documents)
+
+
+def test_legacy_batch_with_string_and_date_timestamps():
+    documents = [
+        {"timestamp": "2024.01.01 00:10", COLUMNS[0]: 50.0, COLUMNS[1]: 40.0},
+        {"timestamp": datetime(2024, 1, 1, 0, 20), COLUMNS[0]: 49.0},
+    ]
+
+    frame = frame_from_raw_batch(raw_batch(documents), batch_schema(COLUMNS, string_timestamps=True), COLUMNS)
+
+    assert frame.index.equals(pd.DatetimeIndex(["2024-01-01 00:10", "2024-01-01 00:20"], name="timestamp"))
+    np.testing.assert_array_equal(frame[COLUMNS[0]], [50.0, 49.0])
+    assert frame[COLUMNS[1]].iloc[0] == 40.0 and np.isnan(frame[COLUMNS[1]].iloc[1])
+
+
+def test_legacy_batch_with_string_timestamps_only():
+    documents = [{"timestamp": "2024.01.01 00:10", COLUMNS[0]: 50.0, COLUMNS[1]: 40.0}]
+
+    frame = frame_from_raw_batch(raw_batch(documents), batch_schema(COLUMNS, string_timestamps=True), COLUMNS)
+
+    assert frame.index[0] == pd.Timestamp("2024-01-01 00:10")
+    assert frame.iloc[0].tolist() == [50.0, 40.0]
+
+
+def test_time_series_batch_with_date_timestamps():
+    documents = [{"timestamp": datetime(2024, 1, 1, 0, 10), COLUMNS[0]: 50.0, COLUMNS[1]: 40.0}]
+
+    frame = frame_from_raw_batch(raw_batch(documents), batch_schema(COLUMNS, string_timestamps=False), COLUMNS)
+
+    assert frame.index[0] == pd.Timestamp("2024-01-01 00:10")
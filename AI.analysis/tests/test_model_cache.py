@@ -0,0 +1,59 @@
+from app.model_cache import ModelCache
+
+
+def test_evicts_least_recently_used_over_model_count():
+    cache = ModelCache(max_models=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a")
+    cache.put("c", "C")
+
+    assert cache.keys() == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_keeps_newest_entry_even_if_oversized():
+    cache = ModelCache(max_bytes=100)
+    cache.put("a", "A", size=60)
+    cache.put("b", "B", size=30)
+    cache.put("c", "C", size=200)
+
+    assert cache.keys() == ["c"]
+    assert cache.stats()["loaded_bytes"] == 200
+
+
+def test_reserve_evicts_ahead_of_a_load():
+    cache = ModelCache(max_models=3, max_bytes=100)
+    cache.put("a", "A", size=40)
+    cache.put("b", "B", size=40)
+
+    cache.reserve(50)
+
+    assert cache.keys() == ["b"]
+    assert cache.stats()["loaded_bytes"] == 40
+
+
+def test_get_or_load_reserves_expected_size_and_loads_once():
+    cache = ModelCache(max_bytes=100)
+    cache.put("a", "A", size=80)
+    loads = []
+
+    def loader():
+        loads.append("b")
+        return "B", 50
+
+    assert cache.get_or_load("b", loader, expected_size=lambda: 50) == "B"
+    assert cache.get_or_load("b", loader, expected_size=lambda: 50) == "B"
+    assert loads == ["b"]
+    assert cache.keys() == ["b"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_invalidate_releases_bytes():
+    cache = ModelCache(max_bytes=100)
+    cache.put("a", "A", size=40)
+    cache.put("a", "A2", size=30)
+    cache.invalidate("a")
+
+    assert "a" not in cache
+    assert cache.stats()["loaded_bytes"] == 0
@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from darts import TimeSeries
+
+from app.model_manager import ModelManager
+
+
+def make_series(length: int, start: str = "2024-01-01") -> TimeSeries:
+    times = pd.date_range(start, periods=length, freq="10T")
+    return TimeSeries.from_times_and_values(times, np.arange(length, dtype=np.float32))
+
+
+TINY_MODEL = {
+    "input_chunk_length": 12, "output_chunk_length": 6, "n_epochs": 1,
+    "model_kwargs": {"pl_trainer_kwargs": {"enable_progress_bar": False, "logger": False}}
+}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    # Never deserialized by these tests: any attempt to load it fails.
+    (models_dir / "TSMixer_a.pt").write_bytes(b"not a checkpoint")
+    return ModelManager(models_dir=str(models_dir), registry_path=str(tmp_path / "models.sqlite"))
+
+
+def test_forecast_cache_hit_skips_model_load(manager):
+    series, prediction = make_series(24), make_series(1, start="2024-01-01 04:00")
+    key = manager.forecast_cache.make_key("TSMixer_a", manager.model_version("TSMixer_a"), series, 1)
+    manager.forecast_cache.put(key, prediction)
+
+    assert manager.predict("TSMixer_a", series, n=1) is prediction
+    assert manager.predict_batch("TSMixer_a", [series], n=1) == [prediction]
+    assert manager.cache_stats()["misses"] == 0
+
+
+def test_forecast_cache_miss_loads_model(manager):
+    with pytest.raises(Exception):
+        manager.predict("TSMixer_a", make_series(24), n=1)
+    assert manager.cache_stats()["misses"] == 1
+
+
+def test_trained_model_is_compiled_only_when_served(tmp_path):
+    manager = ModelManager(
+        models_dir=str(tmp_path / "models"),
+        registry_path=str(tmp_path / "models.sqlite"),
+        inference_mode="torchscript"
+    )
+    manager.train_model("TSMixer_b", make_series(200), TINY_MODEL, metadata={"trained_from": "2024-01-01"})
+
+    # Training only registers the checkpoint; the serving load compiles it.
+    assert "TSMixer_b" not in manager.cache
+    assert manager.model_record("TSMixer_b")["trained_from"] == "2024-01-01"
+    assert manager.get_model("TSMixer_b").compiled is not None
+
+
+def test_checkpoint_replaced_by_another_process_is_reregistered(manager):
+    version = manager.model_version("TSMixer_a")
+    file_path = manager.available_models["TSMixer_a"]
+    manager.cache.put("TSMixer_a", object())
+    mtime_ns = os.stat(file_path).st_mtime_ns + 10**9
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+    assert manager.model_version("TSMixer_a") == version + 1
+    assert "TSMixer_a" not in manager.cache
+
+
+def test_install_swaps_in_staged_checkpoint(manager, tmp_path):
+    trainer = ModelManager(models_dir=str(tmp_path / "staging"), registry_path=str(tmp_path / "staging.sqlite"))
+    trainer.train_model("TSMixer_b", make_series(200), TINY_MODEL)
+    staged_path = trainer.available_models["TSMixer_b"]
+    version = manager.model_version("TSMixer_a")
+    # Left by an earlier training run under the same name; it describes other weights.
+    manager.write_metadata("TSMixer_a", {"scaler": {"columns": ["0"], "mean": [1.0], "scale": [2.0]}})
+
+    assert manager.install_model("TSMixer_a", staged_path) == version + 1
+
+    file_path = manager.available_models["TSMixer_a"]
+    assert not os.path.exists(staged_path) and not os.path.exists(f"{staged_path}.ckpt")
+    assert os.path.exists(f"{file_path}.ckpt")
+    assert manager.read_metadata("TSMixer_a") == {}
+    model = manager.get_model("TSMixer_a")
+    assert model.scaler is None
+    assert manager.cache_stats()["misses"] == 0
+    # The installed pair is what this process registered, so the next lookup does not reload it.
+    assert manager.model_version("TSMixer_a") == version + 1
+    assert manager.get_model("TSMixer_a") is model
+
+
+def test_training_replaces_checkpoint_pair_without_leaving_staged_files(tmp_path):
+    manager = ModelManager(models_dir=str(tmp_path / "models"), registry_path=str(tmp_path / "models.sqlite"))
+    manager.train_model("TSMixer_b", make_series(200), TINY_MODEL, metadata={"trained_from": "2024-01-01"})
+    version = manager.model_version("TSMixer_b")
+
+    manager.fine_tune_model("TSMixer_b", make_series(200, start="2024-01-03"), epochs=1, metadata={"epochs": 1})
+
+    assert manager.model_version("TSMixer_b") == version + 1
+    assert not [name for name in os.listdir(tmp_path / "models") if name.startswith(".")]
+    assert os.path.exists(os.path.join(tmp_path, "models", "TSMixer_b.pt.ckpt"))
+    assert manager.read_metadata("TSMixer_b")["trained_from"] == "2024-01-01"
@@ -0,0 +1,33 @@
+import pytest
+from pymongo.errors import ConnectionFailure
+
+from data import mongo_utils
+
+
+class UnreachableClient:
+    def __init__(self):
+        self.closed = False
+        self.admin = self
+
+    def command(self, name):
+        raise ConnectionFailure("unreachable")
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_ping_closes_client(monkeypatch):
+    clients = []
+
+    def build_client():
+        clients.append(UnreachableClient())
+        return clients[-1]
+
+    monkeypatch.setattr(mongo_utils, "_build_client", build_client)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionFailure):
+            mongo_utils.get_mongo_client()
+
+    assert [client.closed for client in clients] == [True, True]
+    assert mongo_utils._client is None
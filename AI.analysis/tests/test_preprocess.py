@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.utils import preprocess_data, scaler_from_params, scaler_params
+from benchmarks.bench_preprocess import COLUMNS, legacy_preprocess_data, make_sensor_frame
+
+
+def test_matches_legacy_pipeline():
+    df = make_sensor_frame(days=7)
+    expected, expected_scaler = legacy_preprocess_data(df.copy())
+    series_dict, scaler = preprocess_data(df.copy())
+
+    np.testing.assert_allclose(scaler.mean_, expected_scaler.mean_, rtol=1e-6)
+    np.testing.assert_allclose(scaler.scale_, expected_scaler.scale_, rtol=1e-6)
+    for column in COLUMNS:
+        series = series_dict[column]
+        assert series.time_index.equals(expected[column].time_index)
+        assert series.dtype == np.float32
+        np.testing.assert_allclose(series.values(), expected[column].values(), atol=1e-5)
+
+
+def test_multivariate_shares_one_series():
+    series_dict, _ = preprocess_data(make_sensor_frame(days=2), multivariate=True)
+
+    assert list(series_dict) == ["multivariate"]
+    assert list(series_dict["multivariate"].components) == COLUMNS
+
+
+def test_existing_scaler_is_reused():
+    df = make_sensor_frame(days=2)
+    _, fitted = preprocess_data(df.copy())
+    params = scaler_params(fitted)
+    params["mean"] = [0.0] * len(COLUMNS)
+    params["scale"] = [2.0] * len(COLUMNS)
+
+    series_dict, scaler = preprocess_data(df.copy(), scaler=scaler_from_params(params))
+    unscaled, _ = preprocess_data(df.copy(), scaler=scaler_from_params({**params, "scale": [1.0] * len(COLUMNS)}))
+
+    assert scaler.scale_.tolist() == params["scale"]
+    np.testing.assert_allclose(series_dict[COLUMNS[0]].values() * 2, unscaled[COLUMNS[0]].values(), rtol=1e-6)
+
+
+def test_unsorted_input_is_sorted():
+    df = make_sensor_frame(days=1)
+    expected, _ = preprocess_data(df.copy())
+    shuffled, _ = preprocess_data(df.sample(frac=1.0, random_state=0))
+
+    # Duplicated timestamps carry identical readings, so the order they arrive in does not matter.
+    for column in COLUMNS:
+        np.testing.assert_array_equal(shuffled[column].values(), expected[column].values())
@@ -0,0 +1,65 @@
+import pytest
+
+from app.registry import ModelRegistry
+
+METADATA = {
+    "trained_from": "2024-01-01T00:00:00",
+    "trained_until": "2024-06-01T00:00:00",
+    "columns": ["water"],
+    "scaler": {"columns": ["water"], "mean": [50.0], "scale": [10.0]},
+}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / "models.sqlite"))
+
+
+def register(registry, size=100, mtime_ns=1, metadata=None, force=False):
+    return registry.register("TSMixer_a", "models/TSMixer_a.pt", size, mtime_ns, "TSMixer", metadata, force=force)
+
+
+def test_unchanged_checkpoint_keeps_version_and_learnt_values(registry):
+    assert register(registry, metadata=METADATA) == 1
+    registry.record_load("TSMixer_a", 1.5, input_chunk_length=24, output_chunk_length=12)
+
+    # Another worker re-scanning the directory finds the same file but no sidecar.
+    assert register(registry) == 1
+    record = registry.get("TSMixer_a")
+    assert record["load_seconds"] == 1.5
+    assert (record["input_chunk_length"], record["output_chunk_length"]) == (24, 12)
+    assert record["scaler"] == METADATA["scaler"]
+    assert record["columns"] == ["water"]
+
+
+def test_changed_or_forced_checkpoint_bumps_version(registry):
+    register(registry, metadata=METADATA)
+    registry.record_load("TSMixer_a", 1.5, input_chunk_length=24, output_chunk_length=12)
+
+    assert register(registry, mtime_ns=2) == 2
+    record = registry.get("TSMixer_a")
+    assert record["load_seconds"] is None
+    assert record["input_chunk_length"] is None
+    assert record["scaler"] is None
+
+    assert register(registry, mtime_ns=2, force=True) == 3
+    assert register(registry, size=200, mtime_ns=2) == 4
+
+
+def test_record_load_keeps_chunk_lengths_from_metadata(registry):
+    register(registry, metadata={"input_chunk_length": 48, "output_chunk_length": 6})
+    registry.record_load("TSMixer_a", 2.0, input_chunk_length=24, output_chunk_length=12)
+
+    record = registry.get("TSMixer_a")
+    assert (record["input_chunk_length"], record["output_chunk_length"]) == (48, 6)
+    assert record["load_seconds"] == 2.0
+
+
+def test_remove_missing(registry):
+    register(registry)
+    registry.register("TSMixer_b", "models/TSMixer_b.pt", 10, 1, "TSMixer")
+
+    assert registry.remove_missing(["TSMixer_b"]) == ["TSMixer_a"]
+    assert registry.names() == ["TSMixer_b"]
+    assert registry.get("TSMixer_a") is None
+    assert registry.file_size("TSMixer_b") == 10
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from darts import TimeSeries
+
+from app.scaling import SeriesScaler, is_unnamed
+
+PARAMS = {"columns": ["water", "nutrient", "recycle"], "mean": [50.0, 40.0, 30.0], "scale": [10.0, 5.0, 2.0]}
+
+
+def make_series(values, columns=None) -> TimeSeries:
+    values = np.asarray(values, dtype=np.float32)
+    times = pd.date_range("2024-01-01", periods=len(values), freq="10T")
+    return TimeSeries.from_times_and_values(times, values, columns=columns)
+
+
+def test_named_components_pick_their_columns():
+    scaler = SeriesScaler.from_params(PARAMS)
+    series = make_series([[30.0, 60.0], [32.0, 70.0]], columns=["recycle", "water"])
+
+    scaled = scaler.transform(series)
+
+    np.testing.assert_allclose(scaled.values(), [[0.0, 1.0], [1.0, 2.0]])
+    assert scaled.dtype == np.float32
+    np.testing.assert_allclose(scaler.inverse_transform(scaled).values(), series.values())
+
+
+def test_per_column_model_keeps_its_own_column():
+    scaler = SeriesScaler.from_params(PARAMS, columns=["nutrient"])
+
+    assert scaler.columns == ["nutrient"]
+    # A single-tank model scales any univariate series, named or not.
+    np.testing.assert_allclose(scaler.transform(make_series([45.0])).values(), [[1.0]])
+    np.testing.assert_allclose(scaler.transform(make_series([45.0], columns=["tank"])).values(), [[1.0]])
+
+
+def test_unnamed_series_with_one_column_per_tank_is_scaled_by_position():
+    scaler = SeriesScaler.from_params(PARAMS)
+
+    scaled = scaler.transform(make_series([[60.0, 45.0, 32.0]]))
+
+    np.testing.assert_allclose(scaled.values(), [[1.0, 1.0, 1.0]])
+
+
+def test_unnamed_univariate_series_on_multi_tank_scaler_is_rejected():
+    # Forecasting it unscaled would return standardized values to a client expecting tank percent.
+    scaler = SeriesScaler.from_params(PARAMS)
+
+    with pytest.raises(ValueError, match="columns"):
+        scaler.transform(make_series([[55.0], [56.0]]))
+
+
+def test_unknown_names_are_rejected():
+    scaler = SeriesScaler.from_params(PARAMS)
+
+    with pytest.raises(ValueError):
+        scaler.transform(make_series([[1.0]], columns=["pH"]))
+
+
+def test_params_round_trip():
+    scaler = SeriesScaler.from_params(PARAMS, columns=["recycle", "water"])
+
+    assert scaler.to_params() == {"columns": ["recycle", "water"], "mean": [30.0, 50.0], "scale": [2.0, 10.0]}
+
+
+def test_is_unnamed():
+    assert is_unnamed(["0", "1"])
+    assert not is_unnamed(["1"])
+    assert not is_unnamed(["water"])
@@ -0,0 +1,86 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from app.utils import series_from_arrow, series_from_npy, series_from_payload
+
+TIMES = pd.date_range("2024-01-01", periods=4, freq="10T")
+VALUES = [[50.0, 40.0], [49.0, 39.0], [48.0, 38.0], [47.0, 37.0]]
+COLUMNS = ["water", "nutrient"]
+
+
+def assert_expected(series):
+    assert series.time_index.equals(pd.DatetimeIndex(TIMES))
+    assert series.freq == pd.tseries.frequencies.to_offset("10T")
+    assert list(series.components) == COLUMNS
+    assert series.dtype == np.float32
+    np.testing.assert_array_equal(series.values(), VALUES)
+
+
+def test_time_index_strings():
+    payload = {"time_index": [str(t) for t in TIMES], "values": VALUES, "columns": COLUMNS}
+
+    assert_expected(series_from_payload(payload))
+
+
+def test_start_and_freq_with_flat_values():
+    payload = {"start": "2024-01-01T00:00:00", "freq": "10T", "values": np.ravel(VALUES).tolist(), "columns": COLUMNS}
+
+    assert_expected(series_from_payload(payload))
+
+
+def test_start_requires_freq():
+    with pytest.raises(ValueError):
+        series_from_payload({"start": "2024-01-01", "values": [1.0, 2.0]})
+
+
+def test_time_index_ms_infers_freq():
+    payload = {"time_index_ms": (TIMES.asi8 // 10**6).tolist(), "values": VALUES, "columns": COLUMNS}
+
+    assert_expected(series_from_payload(payload))
+
+
+def test_time_index_ms_rejects_uneven_steps():
+    with pytest.raises(ValueError):
+        series_from_payload({"time_index_ms": [0, 600_000, 900_000], "values": [1.0, 2.0, 3.0]})
+
+
+def test_index_cache_reuses_parsed_index():
+    index_cache = {}
+    first = series_from_payload({"start": "2024-01-01", "freq": "10T", "values": [1.0, 2.0]}, index_cache=index_cache)
+    second = series_from_payload({"start": "2024-01-01", "freq": "10T", "values": [3.0, 4.0]}, index_cache=index_cache)
+
+    assert len(index_cache) == 1
+    assert first.time_index.equals(second.time_index)
+
+
+def test_npy_body():
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(VALUES, dtype=np.float32))
+
+    assert_expected(series_from_npy(buffer.getvalue(), "2024-01-01", "10T", columns=COLUMNS))
+
+
+def test_arrow_stream_body():
+    table = pa.table({
+        "timestamp": pa.array(TIMES.values),
+        **{column: pa.array(np.asarray(VALUES)[:, j]) for j, column in enumerate(COLUMNS)},
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    assert_expected(series_from_arrow(sink.getvalue().to_pybytes()))
+
+
+def test_arrow_stream_requires_timestamp_column():
+    table = pa.table({"water": pa.array([1.0])})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    with pytest.raises(ValueError):
+        series_from_arrow(sink.getvalue().to_pybytes())
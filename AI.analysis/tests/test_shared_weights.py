@@ -0,0 +1,48 @@
+import os
+
+import pytest
+import torch
+
+from app.shared_weights import checkpoint_mtime, map_weights, weights_path
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    path = tmp_path / "TSMixer_a.pt"
+    path.write_bytes(b"checkpoint")
+    return str(path)
+
+
+def test_weights_are_mapped_from_a_file_keyed_by_mtime(checkpoint):
+    torch.manual_seed(0)
+    module = torch.nn.Linear(4, 2)
+    expected = {name: tensor.clone() for name, tensor in module.state_dict().items()}
+    mtime_ns = checkpoint_mtime(checkpoint)
+
+    map_weights(module, checkpoint, mtime_ns)
+
+    assert os.path.exists(weights_path(checkpoint, mtime_ns))
+    for name, tensor in module.state_dict().items():
+        assert torch.equal(tensor, expected[name])
+
+
+def test_new_checkpoint_replaces_older_weights(checkpoint):
+    old_mtime = checkpoint_mtime(checkpoint)
+    map_weights(torch.nn.Linear(4, 2), checkpoint, old_mtime)
+    os.utime(checkpoint, ns=(old_mtime + 10**9, old_mtime + 10**9))
+    new_mtime = checkpoint_mtime(checkpoint)
+
+    map_weights(torch.nn.Linear(4, 2), checkpoint, new_mtime)
+
+    assert os.path.exists(weights_path(checkpoint, new_mtime))
+    assert not os.path.exists(weights_path(checkpoint, old_mtime))
+
+
+def test_checkpoint_replaced_during_load_is_not_exported(checkpoint):
+    # The module holds the weights read before the checkpoint changed; they must not be filed under either mtime.
+    stale_mtime = checkpoint_mtime(checkpoint)
+    os.utime(checkpoint, ns=(stale_mtime + 10**9, stale_mtime + 10**9))
+
+    with pytest.raises(ValueError):
+        map_weights(torch.nn.Linear(4, 2), checkpoint, stale_mtime)
+    assert not os.path.exists(weights_path(checkpoint, stale_mtime))
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from darts import TimeSeries
+
+from app.utils import calculate_time_until_threshold, stack_forecasts, threshold_crossings
+
+
+def make_series(values, freq="10T") -> TimeSeries:
+    values = np.asarray(values, dtype=np.float32)
+    times = pd.date_range("2024-01-01", periods=len(values), freq=freq)
+    return TimeSeries.from_times_and_values(times, values)
+
+
+def test_first_step_at_or_below_each_threshold():
+    # (series, steps, columns)
+    values = np.array([
+        [[50.0, 90.0], [40.0, 80.0], [30.0, 70.0]],
+        [[20.0, 10.0], [25.0, 5.0], [10.0, 0.0]],
+    ])
+    thresholds = np.array([[40.0, 35.0, 10.0], [20.0, 5.0, 1.0]])
+
+    crossings = threshold_crossings(values, thresholds)
+
+    assert crossings.shape == (2, 2, 3)
+    np.testing.assert_array_equal(crossings[0], [[1, 2, -1], [-1, -1, -1]])
+    np.testing.assert_array_equal(crossings[1], [[0, -1, -1], [0, 1, 2]])
+
+
+def test_nan_thresholds_pad_shorter_lists():
+    values = np.array([[[5.0]], [[5.0]]])
+    thresholds = np.array([[10.0, np.nan], [10.0, 6.0]])
+
+    np.testing.assert_array_equal(threshold_crossings(values, thresholds)[:, 0], [[0, -1], [0, 0]])
+
+
+def test_stacked_forecasts_of_different_lengths_never_cross_in_padding():
+    stacked = stack_forecasts([make_series([50.0]), make_series([50.0, 40.0, 30.0])])
+
+    assert stacked.shape == (2, 3, 1)
+    assert np.isinf(stacked[0, 1:]).all()
+    np.testing.assert_array_equal(threshold_crossings(stacked, np.array([[35.0], [35.0]]))[:, 0, 0], [-1, 2])
+
+
+def test_minutes_until_threshold():
+    series = make_series([50.0, 40.0, 30.0])
+
+    assert calculate_time_until_threshold(series, 30.0) == 20
+    assert calculate_time_until_threshold(series, 50.0) == 0
+    assert calculate_time_until_threshold(series, 10.0) == -1
+    assert calculate_time_until_threshold(make_series([50.0, 5.0], freq="H"), 10.0) == 60
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.train_model import hold_out
+
+
+def make_history(days: int) -> pd.DataFrame:
+    times = pd.date_range("2024-01-01", periods=days * 144, freq="10T")
+    return pd.DataFrame({"water": np.arange(len(times), dtype=float)}, index=times)
+
+
+def test_hold_out_leaves_the_last_days_out_of_training():
+    df = make_history(10)
+
+    trained = hold_out(df, holdout_days=3)
+
+    assert trained.index.max() == df.index.max() - pd.Timedelta(days=3)
+    assert trained.index.min() == df.index.min()
+    assert hold_out(df) is df
+
+
+def test_hold_out_longer_than_history_is_rejected():
+    with pytest.raises(ValueError):
+        hold_out(make_history(2), holdout_days=5)
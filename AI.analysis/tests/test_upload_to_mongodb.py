@@ -0,0 +1,75 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+from pymongo.errors import BulkWriteError
+
+from data import upload_to_mongodb
+from data.upload_to_mongodb import upload_csv_to_mongodb
+
+
+class InsertResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UniqueIdCollection:
+    # Enforces the unique _id index of a regular collection, like MongoDB with ordered=False.
+    def __init__(self):
+        self.documents = {}
+
+    def insert_many(self, records, ordered=True):
+        inserted, errors = [], []
+        for index, record in enumerate(records):
+            if record["_id"] in self.documents:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            else:
+                self.documents[record["_id"]] = record
+                inserted.append(record["_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": [], "nInserted": len(inserted)})
+        return InsertResult(inserted)
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = UniqueIdCollection()
+    monkeypatch.setenv("MONGO_DB", "db")
+    monkeypatch.setenv("SYNTHETIC_COLLECTION", "readings")
+    monkeypatch.delenv("SENSOR_COLLECTION", raising=False)
+    monkeypatch.setattr(upload_to_mongodb, "get_mongo_client", lambda: {"db": {"readings": collection}})
+    return collection
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "export.csv"
+    pd.DataFrame({
+        "timestamp": [f"2024.01.01 00:{minute:02d}" for minute in range(0, 50, 10)],
+        "Water Level Tank (%)": [50.0, 49.0, 48.0, 47.0, 46.0],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_upload_removes_checkpoint(collection, csv_path):
+    assert upload_csv_to_mongodb(csv_path, chunk_size=2, workers=2) == 5
+
+    assert len(collection.documents) == 5
+    assert not os.path.exists(f"{csv_path}.upload.json")
+
+
+def test_resume_does_not_duplicate_rows(collection, csv_path):
+    upload_csv_to_mongodb(csv_path, chunk_size=2, workers=2)
+    # A run that stopped after the first chunk, while later chunks had already been inserted out of order.
+    upload_to_mongodb._write_checkpoint(f"{csv_path}.upload.json", csv_path, 2)
+
+    assert upload_csv_to_mongodb(csv_path, chunk_size=2, workers=2) == 0
+    assert len(collection.documents) == 5
+
+
+def test_checkpoint_of_another_file_is_ignored(collection, csv_path):
+    with open(f"{csv_path}.upload.json", "w", encoding="utf-8") as f:
+        json.dump({"rows_done": 5, "file_size": 1, "file_mtime_ns": 1}, f)
+
+    assert upload_csv_to_mongodb(csv_path, chunk_size=2, workers=2) == 5